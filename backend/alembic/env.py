@@ -12,7 +12,7 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app.database import Base
-from app.models import User, Trip, TripMember, TripPlan, JoinRequest, Message
+from app.models import User, Trip, TripMember, TripPlan, JoinRequest, Message, RefreshToken, TripRoomSummary
 from app.config import get_settings
 
 # this is the Alembic Config object, which provides
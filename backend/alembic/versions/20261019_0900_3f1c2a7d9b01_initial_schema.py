@@ -0,0 +1,112 @@
+"""initial schema
+
+Revision ID: 3f1c2a7d9b01
+Revises:
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '3f1c2a7d9b01'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Databases set up before migrations existed already have these tables
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if "users" not in existing:
+        op.create_table(
+            "users",
+            sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+            sa.Column("email", sa.String(255), nullable=False),
+            sa.Column("password_hash", sa.String(255), nullable=True),
+            sa.Column("display_name", sa.String(100), nullable=True),
+            sa.Column("avatar_url", sa.Text(), nullable=True),
+            sa.Column("location", sa.String(200), nullable=True),
+            sa.Column("bio", sa.Text(), nullable=True),
+            sa.Column("age_range", sa.String(20), nullable=True),
+            sa.Column("personality", sa.String(50), nullable=True),
+            sa.Column("interests", sa.JSON(), nullable=True),
+            sa.Column("onboarding_completed", sa.Boolean(), nullable=True),
+            sa.Column("oauth_provider", sa.String(50), nullable=True),
+            sa.Column("oauth_id", sa.String(255), nullable=True),
+            sa.Column("created_at", sa.DateTime(), nullable=True),
+            sa.Column("updated_at", sa.DateTime(), nullable=True),
+        )
+        op.create_index("ix_users_email", "users", ["email"], unique=True)
+
+    if "trips" not in existing:
+        op.create_table(
+            "trips",
+            sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+            sa.Column("creator_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id"), nullable=False),
+            sa.Column("title", sa.String(200), nullable=False),
+            sa.Column("location", sa.String(200), nullable=False),
+            sa.Column("duration", sa.String(50), nullable=True),
+            sa.Column("dates", sa.String(100), nullable=True),
+            sa.Column("max_members", sa.Integer(), nullable=True),
+            sa.Column("image_url", sa.Text(), nullable=True),
+            sa.Column("description", sa.Text(), nullable=True),
+            sa.Column("age_limit", sa.String(50), nullable=True),
+            sa.Column("gender", sa.String(50), nullable=True),
+            sa.Column("vibe", sa.String(100), nullable=True),
+            sa.Column("join_type", sa.String(20), nullable=True),
+            sa.Column("tags", sa.JSON(), nullable=True),
+            sa.Column("created_at", sa.DateTime(), nullable=True),
+            sa.Column("updated_at", sa.DateTime(), nullable=True),
+        )
+
+    if "trip_members" not in existing:
+        op.create_table(
+            "trip_members",
+            sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+            sa.Column("trip_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("trips.id", ondelete="CASCADE"), nullable=False),
+            sa.Column("user_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+            sa.Column("role", sa.String(20), nullable=True),
+            sa.Column("joined_at", sa.DateTime(), nullable=True),
+        )
+
+    if "trip_plans" not in existing:
+        op.create_table(
+            "trip_plans",
+            sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+            sa.Column("trip_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("trips.id", ondelete="CASCADE"), nullable=False),
+            sa.Column("day_range", sa.String(20), nullable=False),
+            sa.Column("title", sa.String(200), nullable=False),
+            sa.Column("detail", sa.Text(), nullable=True),
+            sa.Column("order", sa.Integer(), nullable=True),
+        )
+
+    if "join_requests" not in existing:
+        op.create_table(
+            "join_requests",
+            sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+            sa.Column("trip_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("trips.id", ondelete="CASCADE"), nullable=False),
+            sa.Column("user_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+            sa.Column("status", sa.String(20), nullable=True),
+            sa.Column("created_at", sa.DateTime(), nullable=True),
+            sa.Column("updated_at", sa.DateTime(), nullable=True),
+        )
+
+    if "messages" not in existing:
+        op.create_table(
+            "messages",
+            sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+            sa.Column("trip_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("trips.id", ondelete="CASCADE"), nullable=False),
+            sa.Column("sender_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+            sa.Column("content", sa.Text(), nullable=False),
+            sa.Column("created_at", sa.DateTime(), nullable=True),
+        )
+
+
+def downgrade() -> None:
+    for table in ("messages", "join_requests", "trip_plans", "trip_members", "trips", "users"):
+        op.drop_table(table)
@@ -0,0 +1,41 @@
+"""add trip member read pointers
+
+Revision ID: c7d0b93e5a42
+Revises: 8a4e6c2f1d35
+Create Date: 2026-10-19 09:02:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7d0b93e5a42'
+down_revision: Union[str, None] = '8a4e6c2f1d35'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    present = {column["name"] for column in sa.inspect(bind).get_columns("trip_members")}
+    # Nullable, so adding them is a catalog-only change
+    if "last_read_message_id" not in present:
+        op.add_column("trip_members", sa.Column("last_read_message_id", postgresql.UUID(as_uuid=True), nullable=True))
+    if "last_read_at" not in present:
+        op.add_column("trip_members", sa.Column("last_read_at", sa.DateTime(), nullable=True))
+
+    if bind.dialect.name == "postgresql":
+        # CONCURRENTLY keeps the table writable while the index builds, and cannot run in a transaction
+        with op.get_context().autocommit_block():
+            op.execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_trip_members_trip_id ON trip_members (trip_id)")
+    else:
+        op.create_index("ix_trip_members_trip_id", "trip_members", ["trip_id"], if_not_exists=True)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_trip_members_trip_id", table_name="trip_members")
+    op.drop_column("trip_members", "last_read_at")
+    op.drop_column("trip_members", "last_read_message_id")
@@ -0,0 +1,73 @@
+"""add message keyset and full-text indexes
+
+Revision ID: 5b9e1f4c7a20
+Revises: c7d0b93e5a42
+Create Date: 2026-10-19 09:03:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '5b9e1f4c7a20'
+down_revision: Union[str, None] = 'c7d0b93e5a42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# SQLite: external-content FTS5 table over messages, kept current by triggers
+SQLITE_FTS = [
+    "CREATE VIRTUAL TABLE messages_fts USING fts5(content, content='messages', content_rowid='rowid')",
+    """CREATE TRIGGER messages_fts_insert AFTER INSERT ON messages BEGIN
+        INSERT INTO messages_fts(rowid, content) VALUES (new.rowid, new.content);
+    END""",
+    """CREATE TRIGGER messages_fts_delete AFTER DELETE ON messages BEGIN
+        INSERT INTO messages_fts(messages_fts, rowid, content) VALUES ('delete', old.rowid, old.content);
+    END""",
+    """CREATE TRIGGER messages_fts_update AFTER UPDATE OF content ON messages BEGIN
+        INSERT INTO messages_fts(messages_fts, rowid, content) VALUES ('delete', old.rowid, old.content);
+        INSERT INTO messages_fts(rowid, content) VALUES (new.rowid, new.content);
+    END""",
+    # Index the messages written before the table existed
+    "INSERT INTO messages_fts(messages_fts) VALUES ('rebuild')",
+]
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+
+    if bind.dialect.name == "postgresql":
+        # CONCURRENTLY keeps messages writable while the indexes build, and cannot run in a transaction.
+        # The GIN expression must match app.utils.search.POSTGRES_CONFIG for the planner to use it
+        with op.get_context().autocommit_block():
+            op.execute(
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_messages_trip_created_id "
+                "ON messages (trip_id, created_at, id)"
+            )
+            op.execute(
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_messages_content_fts "
+                "ON messages USING GIN (to_tsvector('simple', content))"
+            )
+        return
+
+    op.create_index("ix_messages_trip_created_id", "messages", ["trip_id", "created_at", "id"], if_not_exists=True)
+    if bind.dialect.name == "sqlite" and "messages_fts" not in sa.inspect(bind).get_table_names():
+        for statement in SQLITE_FTS:
+            op.execute(statement)
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+
+    if bind.dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_messages_content_fts")
+            op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_messages_trip_created_id")
+        return
+
+    if bind.dialect.name == "sqlite":
+        for trigger in ("messages_fts_insert", "messages_fts_delete", "messages_fts_update"):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS messages_fts")
+    op.drop_index("ix_messages_trip_created_id", table_name="messages")
@@ -0,0 +1,39 @@
+"""add trip_room_summary
+
+Revision ID: e2a7c5d80f16
+Revises: 5b9e1f4c7a20
+Create Date: 2026-10-19 09:04:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2a7c5d80f16'
+down_revision: Union[str, None] = '5b9e1f4c7a20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # May already exist where the app's create_all ran first.
+    # Rows for existing trips are filled in by backfill_room_summaries at startup
+    if "trip_room_summary" in sa.inspect(op.get_bind()).get_table_names():
+        return
+    op.create_table(
+        "trip_room_summary",
+        sa.Column("trip_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("trips.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("member_count", sa.Integer(), nullable=False),
+        sa.Column("last_message_id", postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column("last_message_content", sa.Text(), nullable=True),
+        sa.Column("last_sender_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id", ondelete="SET NULL"), nullable=True),
+        sa.Column("last_message_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("trip_room_summary")
@@ -22,6 +22,49 @@ class Settings(BaseSettings):
     apple_client_id: str = ""
     apple_client_secret: str = ""
     
+    # WebSocket chat
+    ws_send_queue_size: int = 256
+    ws_send_timeout_seconds: float = 10.0
+    # Heartbeats: ping sockets quiet for an interval, drop ones silent past the idle timeout
+    ws_ping_interval_seconds: float = 25.0
+    ws_idle_timeout_seconds: float = 60.0
+    # Typing indicators: one coalesced update per room per interval
+    ws_typing_interval_ms: int = 500
+    ws_typing_ttl_seconds: float = 5.0
+    # Reconnect replay: recent messages kept per active room, and the most sent from the DB
+    ws_recent_buffer_size: int = 100
+    ws_replay_limit: int = 200
+    # Read pointers from "read" frames are written at most once per interval
+    ws_read_flush_interval_ms: int = 2000
+    # Cross-worker fan-out: 'memory' (single process), 'postgres' or 'redis'
+    chat_backplane: str = "memory"
+    # Redis URL for the 'redis' backplane; 'postgres' uses database_url when empty
+    chat_backplane_url: str = ""
+    # Write-behind message persistence
+    chat_flush_interval_ms: int = 5
+    chat_flush_batch_size: int = 200
+    # Broadcast a message only after its row is committed
+    chat_durable_ack: bool = False
+    # Longest chat message, in bytes of encoded JSON; keeps broadcast frames under
+    # the postgres backplane's 8000-byte NOTIFY limit
+    chat_max_message_bytes: int = 4000
+    
+    # Uploaded files: 'local' (uploads/blobs, served under /static) or 's3'
+    blob_backend: str = "local"
+    # S3-compatible storage; credentials come from the standard AWS environment variables
+    blob_s3_bucket: str = ""
+    blob_s3_endpoint_url: str = ""
+    blob_s3_region: str = ""
+    # Base URL objects are served from (defaults to the bucket URL)
+    blob_s3_public_url: str = ""
+    # Upload size limits, enforced while the file streams in
+    max_upload_bytes: int = 10 * 1024 * 1024
+    max_avatar_bytes: int = 5 * 1024 * 1024
+    # Client cache lifetime (seconds) for /static files that are not content-named
+    static_max_age: int = 3600
+    # Processes rendering image size variants
+    image_workers: int = 2
+    
     # App
     frontend_url: str = "http://localhost:5173"
     backend_url: str = "http://localhost:8000"
@@ -1,4 +1,5 @@
-from sqlalchemy import create_engine
+from contextlib import contextmanager
+from sqlalchemy import create_engine, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.config import get_settings
@@ -63,6 +64,28 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 # Create base class for models
 Base = declarative_base()
 
+# Advisory lock key held while a worker runs startup work (any constant works)
+STARTUP_LOCK_KEY = 7_240_511
+
+
+@contextmanager
+def startup_lock():
+    """
+    Serialize startup work across worker processes.
+    
+    On PostgreSQL this holds a session advisory lock, so with several workers one
+    runs the backfills while the rest wait, then find nothing left to do.
+    """
+    if engine.dialect.name != "postgresql":
+        yield
+        return
+    with engine.connect() as conn:
+        conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": STARTUP_LOCK_KEY})
+        try:
+            yield
+        finally:
+            conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": STARTUP_LOCK_KEY})
+
 
 def get_db():
     """Dependency to get database session."""
@@ -5,5 +5,7 @@ from app.models.trip_member import TripMember
 from app.models.trip_plan import TripPlan
 from app.models.join_request import JoinRequest
 from app.models.message import Message
+from app.models.refresh_token import RefreshToken
+from app.models.trip_room_summary import TripRoomSummary
 
-__all__ = ["User", "Trip", "TripMember", "TripPlan", "JoinRequest", "Message"]
+__all__ = ["User", "Trip", "TripMember", "TripPlan", "JoinRequest", "Message", "RefreshToken", "TripRoomSummary"]
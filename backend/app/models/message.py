@@ -1,6 +1,6 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, Text, DateTime, ForeignKey
+from sqlalchemy import Column, Text, DateTime, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from app.database import Base
@@ -10,6 +10,10 @@ class Message(Base):
     """Chat message model for group conversations."""
     
     __tablename__ = "messages"
+    __table_args__ = (
+        # History pages and sync cursors are range scans over (created_at, id) within a trip
+        Index("ix_messages_trip_created_id", "trip_id", "created_at", "id"),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     trip_id = Column(UUID(as_uuid=True), ForeignKey("trips.id", ondelete="CASCADE"), nullable=False)
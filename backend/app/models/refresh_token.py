@@ -0,0 +1,27 @@
+import uuid
+from datetime import datetime
+from sqlalchemy import Column, DateTime, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID
+from app.database import Base
+
+
+class RefreshToken(Base):
+    """Issued refresh token id, grouped into a rotation family."""
+    
+    __tablename__ = "refresh_tokens"
+    
+    # The JWT "jti" claim; the token itself is never stored
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    # Every token rotated from the same login shares a family
+    family_id = Column(UUID(as_uuid=True), nullable=False, index=True)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    
+    # Set when the token is rotated or its family is revoked
+    revoked_at = Column(DateTime, nullable=True)
+    
+    # Timestamps
+    expires_at = Column(DateTime, nullable=False, index=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f"<RefreshToken {self.id} family {self.family_id}>"
@@ -2,7 +2,7 @@ import uuid
 from datetime import datetime
 from sqlalchemy import Column, String, Integer, DateTime, Text, JSON, ForeignKey
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import deferred, relationship
 from app.database import Base
 
 
@@ -20,8 +20,9 @@ class Trip(Base):
     duration = Column(String(50), nullable=True)
     dates = Column(String(100), nullable=True)
     max_members = Column(Integer, default=8)
-    image_url = Column(Text, nullable=True)
-    description = Column(Text, nullable=True)
+    # Large text, deferred: loaded together on first access or with undefer_group("content")
+    image_url = deferred(Column(Text, nullable=True), group="content")
+    description = deferred(Column(Text, nullable=True), group="content")
     
     # Restrictions
     age_limit = Column(String(50), default="All Ages")
@@ -42,6 +43,7 @@ class Trip(Base):
     plans = relationship("TripPlan", back_populates="trip", cascade="all, delete-orphan", order_by="TripPlan.order")
     join_requests = relationship("JoinRequest", back_populates="trip", cascade="all, delete-orphan")
     messages = relationship("Message", back_populates="trip", cascade="all, delete-orphan")
+    room_summary = relationship("TripRoomSummary", back_populates="trip", cascade="all, delete-orphan", uselist=False)
     
     def __repr__(self):
         return f"<Trip {self.title}>"
@@ -12,7 +12,7 @@ class TripMember(Base):
     __tablename__ = "trip_members"
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    trip_id = Column(UUID(as_uuid=True), ForeignKey("trips.id", ondelete="CASCADE"), nullable=False)
+    trip_id = Column(UUID(as_uuid=True), ForeignKey("trips.id", ondelete="CASCADE"), nullable=False, index=True)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     
     # Role: 'leader' or 'member'
@@ -21,6 +21,10 @@ class TripMember(Base):
     # Timestamps
     joined_at = Column(DateTime, default=datetime.utcnow)
     
+    # Read pointer: newest message this member has seen, and its created_at
+    last_read_message_id = Column(UUID(as_uuid=True), nullable=True)
+    last_read_at = Column(DateTime, nullable=True)
+    
     # Relationships
     trip = relationship("Trip", back_populates="members")
     user = relationship("User", back_populates="trip_memberships")
@@ -0,0 +1,29 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, Text, DateTime, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import relationship
+from app.database import Base
+
+
+class TripRoomSummary(Base):
+    """Precomputed chat-list row for a trip, kept current by the writes that change it."""
+    
+    __tablename__ = "trip_room_summary"
+    
+    trip_id = Column(UUID(as_uuid=True), ForeignKey("trips.id", ondelete="CASCADE"), primary_key=True)
+    member_count = Column(Integer, nullable=False, default=0)
+    
+    # Newest message in the room
+    last_message_id = Column(UUID(as_uuid=True), nullable=True)
+    last_message_content = Column(Text, nullable=True)
+    last_sender_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    last_message_at = Column(DateTime, nullable=True)
+    
+    # Timestamps
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    # Relationships
+    trip = relationship("Trip", back_populates="room_summary")
+    
+    def __repr__(self):
+        return f"<TripRoomSummary {self.trip_id}>"
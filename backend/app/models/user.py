@@ -2,7 +2,7 @@ import uuid
 from datetime import datetime
 from sqlalchemy import Column, String, Boolean, DateTime, Text, JSON
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import deferred, relationship
 from app.database import Base
 
 
@@ -17,9 +17,10 @@ class User(Base):
     
     # Profile
     display_name = Column(String(100), nullable=True)
-    avatar_url = Column(Text, nullable=True)
+    # Large text, deferred: auth loads the user on every request without them
+    avatar_url = deferred(Column(Text, nullable=True), group="profile")
     location = Column(String(200), nullable=True)
-    bio = Column(Text, nullable=True)
+    bio = deferred(Column(Text, nullable=True), group="profile")
     
     # Onboarding data
     age_range = Column(String(20), nullable=True)
@@ -8,8 +8,9 @@ from app.models.user import User
 from app.schemas.auth import UserRegister, UserLogin, Token, RefreshToken
 from app.utils.security import (
     get_password_hash, verify_password, 
-    create_access_token, create_refresh_token, verify_refresh_token
+    create_access_token, verify_refresh_token
 )
+from app.utils.token_store import issue_refresh_token, rotate_refresh_token, revoke_family
 from app.config import get_settings
 
 router = APIRouter(prefix="/api/auth", tags=["Authentication"])
@@ -53,7 +54,7 @@ async def register(user_data: UserRegister, db: Session = Depends(get_db)):
     
     # Generate tokens
     access_token = create_access_token(data={"sub": str(new_user.id), "email": new_user.email})
-    refresh_token = create_refresh_token(data={"sub": str(new_user.id)})
+    refresh_token = issue_refresh_token(db, new_user.id)
     
     return Token(access_token=access_token, refresh_token=refresh_token)
 
@@ -77,7 +78,7 @@ async def login(user_data: UserLogin, db: Session = Depends(get_db)):
     
     # Generate tokens
     access_token = create_access_token(data={"sub": str(user.id), "email": user.email})
-    refresh_token = create_refresh_token(data={"sub": str(user.id)})
+    refresh_token = issue_refresh_token(db, user.id)
     
     return Token(access_token=access_token, refresh_token=refresh_token)
 
@@ -102,13 +103,30 @@ async def refresh_token(token_data: RefreshToken, db: Session = Depends(get_db))
             detail="User not found"
         )
     
-    # Generate new tokens
+    # Rotate: the presented token is used up, and reuse revokes its whole family
+    new_refresh_token = rotate_refresh_token(db, payload)
+    if not new_refresh_token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Refresh token has been revoked"
+        )
+    
     access_token = create_access_token(data={"sub": str(user.id), "email": user.email})
-    new_refresh_token = create_refresh_token(data={"sub": str(user.id)})
     
     return Token(access_token=access_token, refresh_token=new_refresh_token)
 
 
+@router.post("/logout")
+async def logout(token_data: RefreshToken, db: Session = Depends(get_db)):
+    """Revoke the session (refresh token family) the token belongs to."""
+    payload = verify_refresh_token(token_data.refresh_token)
+    
+    if payload and payload.get("fam"):
+        revoke_family(db, payload["fam"])
+    
+    return {"message": "Logged out"}
+
+
 @router.get("/google")
 async def google_login(request: Request):
     """Initiate Google OAuth login."""
@@ -146,7 +164,7 @@ async def google_callback(request: Request, db: Session = Depends(get_db)):
         
         # Generate tokens
         access_token = create_access_token(data={"sub": str(user.id), "email": user.email})
-        refresh_token = create_refresh_token(data={"sub": str(user.id)})
+        refresh_token = issue_refresh_token(db, user.id)
         
         # Redirect to frontend with tokens
         redirect_url = f"{settings.frontend_url}/auth/callback?access_token={access_token}&refresh_token={refresh_token}"
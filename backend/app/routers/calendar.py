@@ -7,9 +7,13 @@ from app.models.user import User
 from app.models.trip import Trip
 from app.models.trip_member import TripMember
 from app.utils.dependencies import get_current_user
+from app.utils.responses import FastJSONResponse
 
 router = APIRouter(prefix="/api/calendar", tags=["Calendar"])
 
+# Calendar entries only need these; skips image_url and description
+EVENT_COLUMNS = (Trip.id, Trip.title, Trip.location, Trip.dates, Trip.vibe)
+
 
 @router.get("/events")
 async def get_calendar_events(
@@ -26,7 +30,7 @@ async def get_calendar_events(
     if not trip_ids:
         return []
     
-    trips = db.query(Trip).filter(Trip.id.in_(trip_ids)).all()
+    trips = db.query(*EVENT_COLUMNS).filter(Trip.id.in_(trip_ids)).all()
     
     # Format for calendar
     events = []
@@ -42,7 +46,7 @@ async def get_calendar_events(
             "vibe": trip.vibe
         })
     
-    return events
+    return FastJSONResponse(events)
 
 
 @router.get("/trips-by-month")
@@ -60,7 +64,7 @@ async def get_trips_by_month(
     if not trip_ids:
         return []
     
-    trips = db.query(Trip).filter(Trip.id.in_(trip_ids)).all()
+    trips = db.query(*EVENT_COLUMNS).filter(Trip.id.in_(trip_ids)).all()
     
     # This is a simplified version - in production you'd parse dates properly
     # and only return trips for the requested month
@@ -79,4 +83,4 @@ async def get_trips_by_month(
             "vibe": trip.vibe
         })
     
-    return result
+    return FastJSONResponse(result)
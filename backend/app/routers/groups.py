@@ -1,12 +1,16 @@
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from sqlalchemy import func
+from sqlalchemy.orm import Session, aliased
 from typing import List
 from app.database import get_db
 from app.models.user import User
 from app.models.trip import Trip
 from app.models.trip_member import TripMember
 from app.models.message import Message
+from app.models.trip_room_summary import TripRoomSummary
 from app.utils.dependencies import get_current_user
+from app.utils.responses import FastJSONResponse
+from app.storage import blob_store
 
 router = APIRouter(prefix="/api/groups", tags=["Groups"])
 
@@ -16,54 +20,66 @@ async def get_my_groups(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Get all groups/packs the user is a member of."""
-    # Get all trip memberships
-    memberships = db.query(TripMember).filter(TripMember.user_id == current_user.id).all()
-    trip_ids = [m.trip_id for m in memberships]
+    """
+    Get all groups/packs the user is a member of, in a single query.
     
-    if not trip_ids:
-        return []
+    Member count and last message come from the precomputed trip_room_summary rows.
+    The unread count is a correlated subquery, a range scan on
+    ix_messages_trip_created_id over other members' messages newer than the
+    user's read pointer (or, before they read anything, newer than when they joined).
+    """
+    unread_messages = aliased(Message)
+    unread = db.query(func.count(unread_messages.id)).filter(
+        unread_messages.trip_id == TripMember.trip_id,
+        unread_messages.created_at > func.coalesce(TripMember.last_read_at, TripMember.joined_at),
+        unread_messages.sender_id != TripMember.user_id
+    ).correlate(TripMember).scalar_subquery()
     
-    trips = db.query(Trip).filter(Trip.id.in_(trip_ids)).all()
+    rows = db.query(
+        Trip.id,
+        Trip.title,
+        Trip.location,
+        Trip.image_url,
+        TripRoomSummary.member_count,
+        unread.label("unread"),
+        TripRoomSummary.last_message_content,
+        TripRoomSummary.last_message_at,
+        User.display_name
+    ).select_from(TripMember).join(
+        Trip, Trip.id == TripMember.trip_id
+    ).outerjoin(
+        TripRoomSummary, TripRoomSummary.trip_id == Trip.id
+    ).outerjoin(
+        User, User.id == TripRoomSummary.last_sender_id
+    ).filter(
+        TripMember.user_id == current_user.id
+    ).order_by(
+        # Most recently active packs first, silent ones last
+        TripRoomSummary.last_message_at.is_(None), TripRoomSummary.last_message_at.desc()
+    ).all()
     
     result = []
-    for trip in trips:
-        # Get member count
-        member_count = db.query(TripMember).filter(TripMember.trip_id == trip.id).count()
-        
-        # Get last message
-        last_message = db.query(Message, User).join(User, Message.sender_id == User.id).filter(
-            Message.trip_id == trip.id
-        ).order_by(Message.created_at.desc()).first()
-        
+    for row in rows:
         last_msg_text = None
         last_msg_time = None
         
-        if last_message:
-            msg, sender = last_message
-            sender_name = sender.display_name or "Someone"
-            last_msg_text = f"{sender_name}: {msg.content[:50]}..."
-            last_msg_time = msg.created_at.strftime("%I:%M %p")
-        
-        # Count unread messages (simplified - just show if there are recent messages)
-        unread = 0
-        if last_message:
-            msg, _ = last_message
-            # In a real app, you'd track last read timestamp
-            unread = 0
+        if row.last_message_at is not None:
+            sender_name = row.display_name or "Someone"
+            last_msg_text = f"{sender_name}: {row.last_message_content[:50]}..."
+            last_msg_time = row.last_message_at.strftime("%I:%M %p")
         
         result.append({
-            "id": str(trip.id),
-            "title": trip.title,
-            "location": trip.location,
-            "members": f"{member_count} Members",
+            "id": str(row.id),
+            "title": row.title,
+            "location": row.location,
+            "members": f"{row.member_count or 0} Members",
             "lastMessage": last_msg_text or "No messages yet",
             "time": last_msg_time or "",
-            "unread": unread,
-            "image": trip.image_url or "/images/trip-beach.png"
+            "unread": row.unread,
+            "image": blob_store.thumbnail_url(row.image_url) or "/images/trip-beach.png"
         })
     
-    return result
+    return FastJSONResponse(result)
 
 
 @router.get("/{trip_id}")
@@ -73,18 +89,20 @@ async def get_group_details(
     db: Session = Depends(get_db)
 ):
     """Get group details for chat header."""
-    trip = db.query(Trip).filter(Trip.id == trip_id).first()
+    row = db.query(
+        Trip.id, Trip.title, Trip.location, Trip.image_url, Trip.created_at, TripRoomSummary.member_count
+    ).outerjoin(
+        TripRoomSummary, TripRoomSummary.trip_id == Trip.id
+    ).filter(Trip.id == trip_id).first()
     
-    if not trip:
+    if not row:
         return {"error": "Trip not found"}
     
-    member_count = db.query(TripMember).filter(TripMember.trip_id == trip_id).count()
-    
     return {
-        "id": str(trip.id),
-        "title": trip.title,
-        "location": trip.location,
-        "member_count": member_count,
-        "image": trip.image_url,
-        "created_at": trip.created_at.isoformat()
+        "id": str(row.id),
+        "title": row.title,
+        "location": row.location,
+        "member_count": row.member_count or 0,
+        "image": row.image_url,
+        "created_at": row.created_at.isoformat()
     }
@@ -1,27 +1,77 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
+from sqlalchemy import tuple_, text
+from sqlalchemy.orm import Session, load_only
+from typing import List, Optional
 from uuid import UUID
 from app.database import get_db
 from app.models.user import User
 from app.models.message import Message
 from app.models.trip import Trip
 from app.models.trip_member import TripMember
-from app.schemas.message import MessageCreate, MessageResponse, MessageList
+from app.schemas.message import MessageCreate, MessageResponse, MessageList, MessageSearchHit, MessageSearchList
 from app.utils.dependencies import get_current_user
+from app.utils.search import highlight, search_filter
+from app.utils.room_summary import record_messages
+from app.storage import blob_store
 
 router = APIRouter(prefix="/api/messages", tags=["Messages"])
 
+# Sender columns a message needs; avatar_url is deferred on User
+SENDER_COLUMNS = load_only(User.id, User.display_name, User.avatar_url)
+
+
+def _message_responses(rows, current_user: User) -> List[MessageResponse]:
+    """Build responses from (Message, User) rows."""
+    return [
+        MessageResponse(
+            id=msg.id,
+            trip_id=msg.trip_id,
+            sender_id=msg.sender_id,
+            sender_name=sender.display_name,
+            sender_avatar=blob_store.thumbnail_url(sender.avatar_url),
+            content=msg.content,
+            created_at=msg.created_at,
+            is_me=msg.sender_id == current_user.id
+        )
+        for msg, sender in rows
+    ]
+
+
+def _estimated_message_count(db: Session, trip_id: UUID) -> Optional[int]:
+    """
+    Planner's row estimate for a trip's messages, without scanning them.
+    
+    Only available on PostgreSQL; elsewhere returns None.
+    """
+    if db.get_bind().dialect.name != "postgresql":
+        return None
+    plan = db.execute(
+        text("EXPLAIN (FORMAT JSON) SELECT 1 FROM messages WHERE trip_id = :trip_id"),
+        {"trip_id": str(trip_id)}
+    ).scalar()
+    return int(plan[0]["Plan"]["Plan Rows"])
+
 
 @router.get("/trips/{trip_id}", response_model=MessageList)
 async def get_trip_messages(
     trip_id: UUID,
     skip: int = 0,
     limit: int = 50,
+    after: Optional[UUID] = None,
+    before: Optional[UUID] = None,
+    latest: bool = False,
+    estimate_total: bool = False,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Get message history for a trip (must be a member)."""
+    """
+    Get message history for a trip (must be a member).
+    
+    With `after` or `before` (a message id), returns up to `limit` messages newer or
+    older than that message, oldest first, without counting the whole history.
+    With `latest`, returns the newest page the same way; page back with `before`.
+    `estimate_total` adds an approximate total to cursor pages (PostgreSQL only).
+    """
     # Check if user is a member
     membership = db.query(TripMember).filter(
         TripMember.trip_id == trip_id,
@@ -31,28 +81,113 @@ async def get_trip_messages(
     if not membership:
         raise HTTPException(status_code=403, detail="Not a member of this trip")
     
-    # Get messages
-    messages_query = db.query(Message, User).join(User, Message.sender_id == User.id).filter(
+    if sum(bool(mode) for mode in (after, before, latest)) > 1:
+        raise HTTPException(status_code=400, detail="Use only one of after, before or latest")
+    
+    messages_query = db.query(Message, User).join(User, Message.sender_id == User.id).options(SENDER_COLUMNS).filter(
         Message.trip_id == trip_id
-    ).order_by(Message.created_at.asc())
+    )
+    
+    cursor = after or before
+    if cursor or latest:
+        if cursor:
+            anchor = db.query(Message.created_at, Message.id).filter(
+                Message.id == cursor,
+                Message.trip_id == trip_id
+            ).first()
+            if not anchor:
+                raise HTTPException(status_code=404, detail="Message not found")
+            
+            # Range scan on ix_messages_trip_created_id; id breaks created_at ties
+            key = tuple_(Message.created_at, Message.id)
+            anchor_key = tuple_(anchor.created_at, anchor.id)
+            messages_query = messages_query.filter(key > anchor_key if after else key < anchor_key)
+        
+        if after:
+            messages_query = messages_query.order_by(Message.created_at.asc(), Message.id.asc())
+        else:
+            # Newest first, read backwards off the same index
+            messages_query = messages_query.order_by(Message.created_at.desc(), Message.id.desc())
+        
+        # One extra row tells whether another page exists
+        messages = messages_query.limit(limit + 1).all()
+        has_more = len(messages) > limit
+        messages = messages[:limit]
+        if not after:
+            messages.reverse()
+        
+        return MessageList(
+            messages=_message_responses(messages, current_user),
+            total=_estimated_message_count(db, trip_id) if estimate_total else None,
+            has_more=has_more
+        )
+    
+    # Get messages
+    messages_query = messages_query.order_by(Message.created_at.asc())
     
     total = messages_query.count()
     messages = messages_query.offset(skip).limit(limit).all()
     
-    result = []
-    for msg, sender in messages:
-        result.append(MessageResponse(
-            id=msg.id,
-            trip_id=msg.trip_id,
-            sender_id=msg.sender_id,
-            sender_name=sender.display_name,
-            sender_avatar=sender.avatar_url,
-            content=msg.content,
-            created_at=msg.created_at,
-            is_me=msg.sender_id == current_user.id
-        ))
+    return MessageList(
+        messages=_message_responses(messages, current_user),
+        total=total,
+        has_more=skip + len(messages) < total
+    )
+
+
+@router.get("/trips/{trip_id}/search", response_model=MessageSearchList)
+async def search_trip_messages(
+    trip_id: UUID,
+    q: str,
+    limit: int = 20,
+    before: Optional[UUID] = None,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Full-text search in a trip's messages (must be a member), newest matches first.
+    
+    Page on with `before` set to the last result's id.
+    """
+    membership = db.query(TripMember).filter(
+        TripMember.trip_id == trip_id,
+        TripMember.user_id == current_user.id
+    ).first()
+    
+    if not membership:
+        raise HTTPException(status_code=403, detail="Not a member of this trip")
+    
+    q = q.strip()
+    if not q:
+        raise HTTPException(status_code=400, detail="Search query is empty")
+    
+    search_query = db.query(Message, User).join(User, Message.sender_id == User.id).options(SENDER_COLUMNS).filter(
+        Message.trip_id == trip_id
+    )
+    search_query, snippet = search_filter(db, search_query, q)
+    
+    if before:
+        anchor = db.query(Message.created_at, Message.id).filter(
+            Message.id == before,
+            Message.trip_id == trip_id
+        ).first()
+        if not anchor:
+            raise HTTPException(status_code=404, detail="Message not found")
+        search_query = search_query.filter(
+            tuple_(Message.created_at, Message.id) < tuple_(anchor.created_at, anchor.id)
+        )
+    
+    rows = search_query.add_columns(snippet).order_by(
+        Message.created_at.desc(), Message.id.desc()
+    ).limit(limit + 1).all()
     
-    return MessageList(messages=result, total=total)
+    page = rows[:limit]
+    responses = _message_responses([(msg, sender) for msg, sender, _ in page], current_user)
+    results = [
+        MessageSearchHit(**response.model_dump(), snippet=highlight(row_snippet))
+        for response, (_, _, row_snippet) in zip(responses, page)
+    ]
+    return MessageSearchList(results=results, has_more=len(rows) > limit)
 
 
 @router.post("/trips/{trip_id}", response_model=MessageResponse)
@@ -80,6 +215,14 @@ async def send_message(
     )
     
     db.add(new_message)
+    db.flush()
+    record_messages(db, [{
+        "id": new_message.id,
+        "trip_id": new_message.trip_id,
+        "sender_id": new_message.sender_id,
+        "content": new_message.content,
+        "created_at": new_message.created_at
+    }])
     db.commit()
     db.refresh(new_message)
     
@@ -88,7 +231,7 @@ async def send_message(
         trip_id=new_message.trip_id,
         sender_id=new_message.sender_id,
         sender_name=current_user.display_name,
-        sender_avatar=current_user.avatar_url,
+        sender_avatar=blob_store.thumbnail_url(current_user.avatar_url),
         content=new_message.content,
         created_at=new_message.created_at,
         is_me=True
@@ -1,5 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, load_only, undefer_group
 from typing import List, Optional
 from uuid import UUID
 from app.database import get_db
@@ -14,9 +14,23 @@ from app.schemas.trip import (
     JoinRequestResponse
 )
 from app.utils.dependencies import get_current_user, get_optional_user
+from app.utils.room_summary import refresh_member_count
+from app.utils.responses import FastJSONResponse
+from app.storage import blob_store
 
 router = APIRouter(prefix="/api/trips", tags=["Trips"])
 
+# Columns a TripList card needs; lists select these instead of whole Trip rows
+TRIP_LIST_COLUMNS = (
+    Trip.id, Trip.title, Trip.location, Trip.duration, Trip.image_url, Trip.tags, Trip.max_members
+)
+# What suggestions are scored on; image_url is only fetched for the trips returned
+TRIP_SCORING_COLUMNS = (
+    Trip.id, Trip.title, Trip.location, Trip.duration, Trip.tags, Trip.max_members, Trip.vibe
+)
+# User columns shown next to members and join requests
+USER_CARD = load_only(User.id, User.display_name, User.email, User.avatar_url)
+
 
 @router.get("/", response_model=List[TripList])
 async def list_trips(
@@ -28,7 +42,7 @@ async def list_trips(
     db: Session = Depends(get_db)
 ):
     """List all trips with optional search and filtering."""
-    query = db.query(Trip)
+    query = db.query(*TRIP_LIST_COLUMNS)
     
     if search:
         query = query.filter(
@@ -53,7 +67,8 @@ async def list_trips(
             title=trip.title,
             location=trip.location,
             duration=trip.duration,
-            image_url=trip.image_url,
+            # Cards show the thumbnail; the detail page has the full image
+            image_url=blob_store.thumbnail_url(trip.image_url),
             tags=trip.tags or [],
             member_count=member_count,
             max_members=trip.max_members,
@@ -75,7 +90,7 @@ async def get_suggested_trips(
     """
     # 1. Get all candidates (future trips, excluding ones user created or joined)
     # real-world optimization: filter by date > now
-    all_trips = db.query(Trip).all()
+    all_trips = db.query(*TRIP_SCORING_COLUMNS).all()
     
     # Get user's joined trip IDs to exclude
     joined_trip_ids = [m.trip_id for m in db.query(TripMember).filter(TripMember.user_id == current_user.id).all()]
@@ -133,15 +148,21 @@ async def get_suggested_trips(
     candidates.sort(key=lambda x: x["score"], reverse=True)
     
     # Return top N
+    top = candidates[:limit]
+    images = dict(
+        db.query(Trip.id, Trip.image_url).filter(Trip.id.in_([item["trip"].id for item in top])).all()
+    ) if top else {}
+    
     result = []
-    for item in candidates[:limit]:
+    for item in top:
         trip = item["trip"]
         result.append(TripList(
             id=trip.id,
             title=trip.title or "Untitled Trip",
             location=trip.location or "Unknown Location",
             duration=trip.duration,
-            image_url=trip.image_url,
+            # Cards show the thumbnail; the detail page has the full image
+            image_url=blob_store.thumbnail_url(images.get(trip.id)),
             tags=trip.tags or [],
             member_count=item["member_count"],
             max_members=trip.max_members or 8,
@@ -186,6 +207,7 @@ async def create_trip(
         role="leader"
     )
     db.add(leader_member)
+    refresh_member_count(db, new_trip.id)
     
     # Add trip plans if provided
     for i, plan in enumerate(trip_data.plans or []):
@@ -211,13 +233,15 @@ async def get_trip_detail(
     db: Session = Depends(get_db)
 ):
     """Get detailed trip information."""
-    trip = db.query(Trip).filter(Trip.id == trip_id).first()
+    trip = db.query(Trip).options(undefer_group("content")).filter(Trip.id == trip_id).first()
     
     if not trip:
         raise HTTPException(status_code=404, detail="Trip not found")
     
     # Get members
-    members_query = db.query(TripMember, User).join(User).filter(TripMember.trip_id == trip_id).all()
+    members_query = db.query(TripMember, User).join(User).options(USER_CARD).filter(
+        TripMember.trip_id == trip_id
+    ).all()
     
     members = []
     leader = None
@@ -228,14 +252,14 @@ async def get_trip_detail(
         member_info = MemberInfo(
             id=user.id,
             display_name=user.display_name,
-            avatar_url=user.avatar_url,
+            avatar_url=blob_store.thumbnail_url(user.avatar_url),
             role=membership.role
         )
         
         if membership.role == "leader":
             leader = LeaderInfo(
                 name=user.display_name or user.email,
-                avatar=user.avatar_url
+                avatar=blob_store.thumbnail_url(user.avatar_url)
             )
         
         members.append(member_info)
@@ -363,6 +387,7 @@ async def join_trip(
             role="member"
         )
         db.add(new_member)
+        refresh_member_count(db, trip_id)
         db.commit()
         
         return {"status": "joined", "message": "Successfully joined the trip"}
@@ -403,7 +428,7 @@ async def get_join_requests(
     if trip.creator_id != current_user.id:
         raise HTTPException(status_code=403, detail="Only the trip leader can view requests")
     
-    requests = db.query(JoinRequest, User).join(User).filter(
+    requests = db.query(JoinRequest, User).join(User).options(USER_CARD).filter(
         JoinRequest.trip_id == trip_id,
         JoinRequest.status == "pending"
     ).all()
@@ -412,7 +437,7 @@ async def get_join_requests(
         id=req.id,
         user_id=user.id,
         user_name=user.display_name,
-        user_avatar=user.avatar_url,
+        user_avatar=blob_store.thumbnail_url(user.avatar_url),
         status=req.status,
         created_at=req.created_at
     ) for req, user in requests]
@@ -443,6 +468,7 @@ async def approve_request(
         role="member"
     )
     db.add(new_member)
+    refresh_member_count(db, trip_id)
     
     # Update request status
     join_request.status = "approved"
@@ -481,17 +507,19 @@ async def get_trip_members(
     db: Session = Depends(get_db)
 ):
     """Get all members of a trip."""
-    members = db.query(TripMember, User).join(User).filter(TripMember.trip_id == trip_id).all()
+    members = db.query(TripMember, User).join(User).options(USER_CARD).filter(
+        TripMember.trip_id == trip_id
+    ).all()
     
-    return [
+    return FastJSONResponse([
         {
             "id": str(user.id),
             "name": user.display_name or user.email,
-            "avatar": user.avatar_url,
+            "avatar": blob_store.thumbnail_url(user.avatar_url),
             "role": membership.role
         }
         for membership, user in members
-    ]
+    ])
 
 
 @router.delete("/{trip_id}/members/{user_id}")
@@ -524,6 +552,7 @@ async def remove_member(
         raise HTTPException(status_code=404, detail="Member not found")
     
     db.delete(membership)
+    refresh_member_count(db, trip_id)
     db.commit()
     
     return {"message": "Member removed"}
@@ -535,7 +564,9 @@ async def search_similar_trips(
     db: Session = Depends(get_db)
 ):
     """Search for similar trips by destination."""
-    trips = db.query(Trip).filter(Trip.location.ilike(f"%{destination}%")).limit(5).all()
+    trips = db.query(
+        Trip.id, Trip.title, Trip.location, Trip.dates, Trip.max_members, Trip.age_limit, Trip.vibe, Trip.image_url
+    ).filter(Trip.location.ilike(f"%{destination}%")).limit(5).all()
     
     result = []
     for trip in trips:
@@ -547,7 +578,7 @@ async def search_similar_trips(
             "date": trip.dates,
             "groupSize": f"{member_count}/{trip.max_members}",
             "restrictions": f"{trip.age_limit}, {trip.vibe}",
-            "image": trip.image_url
+            "image": blob_store.thumbnail_url(trip.image_url)
         })
     
-    return result
+    return FastJSONResponse(result)
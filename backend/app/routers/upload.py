@@ -1,32 +1,27 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException
-import shutil
-import os
-import uuid
+from fastapi import APIRouter, Depends, UploadFile, File, HTTPException
 from app.config import get_settings
+from app.models.user import User
+from app.storage import UploadTooLarge, blob_store
+from app.utils.dependencies import get_current_user
 
-router = APIRouter(prefix="/api", tags=["Upload"])
 settings = get_settings()
 
-UPLOAD_DIR = "uploads"
-os.makedirs(UPLOAD_DIR, exist_ok=True)
+router = APIRouter(prefix="/api", tags=["Upload"])
+
 
 @router.post("/upload")
-async def upload_file(file: UploadFile = File(...)):
-    """Upload a file and get the base64 URL (for serverless compatibility)."""
+async def upload_file(
+    file: UploadFile = File(...),
+    current_user: User = Depends(get_current_user)
+):
+    """Upload an image to blob storage and get its URL."""
     try:
-        # Read file content
-        content = await file.read()
-        
-        # Encode to base64
-        import base64
-        encoded_string = base64.b64encode(content).decode("utf-8")
-        
-        # Create data URI
-        # Default to image/jpeg if not detected, but UploadFile usually has content_type
-        content_type = file.content_type or "image/jpeg"
-        data_uri = f"data:{content_type};base64,{encoded_string}"
-
-        return {"url": data_uri}
-
+        blob = await blob_store.save_upload(file, max_bytes=settings.max_upload_bytes)
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Could not process file: {str(e)}")
+    
+    return {"url": blob.url}
@@ -10,6 +10,9 @@ from app.models.join_request import JoinRequest
 from app.schemas.user import UserProfile, UserUpdate, UserOnboarding
 from app.schemas.trip import TripList
 from app.utils.dependencies import get_current_user
+from app.utils.responses import FastJSONResponse
+from app.websocket.chat import notify_profile_changed
+from app.storage import blob_store
 
 router = APIRouter(prefix="/api/users", tags=["Users"])
 
@@ -17,19 +20,7 @@ router = APIRouter(prefix="/api/users", tags=["Users"])
 @router.get("/me", response_model=UserProfile)
 async def get_current_user_profile(current_user: User = Depends(get_current_user)):
     """Get current user's profile."""
-    return UserProfile(
-        id=current_user.id,
-        email=current_user.email,
-        display_name=current_user.display_name,
-        avatar_url=current_user.avatar_url,
-        location=current_user.location,
-        bio=current_user.bio,
-        age_range=current_user.age_range,
-        personality=current_user.personality,
-        interests=current_user.interests or [],
-        onboarding_completed=current_user.onboarding_completed,
-        created_at=current_user.created_at
-    )
+    return UserProfile.model_validate(current_user)
 
 
 @router.put("/me", response_model=UserProfile)
@@ -47,19 +38,10 @@ async def update_profile(
     db.commit()
     db.refresh(current_user)
     
-    return UserProfile(
-        id=current_user.id,
-        email=current_user.email,
-        display_name=current_user.display_name,
-        avatar_url=current_user.avatar_url,
-        location=current_user.location,
-        bio=current_user.bio,
-        age_range=current_user.age_range,
-        personality=current_user.personality,
-        interests=current_user.interests or [],
-        onboarding_completed=current_user.onboarding_completed,
-        created_at=current_user.created_at
-    )
+    if "display_name" in update_dict or "avatar_url" in update_dict:
+        await notify_profile_changed(db, current_user)
+    
+    return UserProfile.model_validate(current_user)
 
 
 @router.post("/me/onboarding", response_model=UserProfile)
@@ -78,20 +60,9 @@ async def complete_onboarding(
     
     db.commit()
     db.refresh(current_user)
+    await notify_profile_changed(db, current_user)
     
-    return UserProfile(
-        id=current_user.id,
-        email=current_user.email,
-        display_name=current_user.display_name,
-        avatar_url=current_user.avatar_url,
-        location=current_user.location,
-        bio=current_user.bio,
-        age_range=current_user.age_range,
-        personality=current_user.personality,
-        interests=current_user.interests or [],
-        onboarding_completed=current_user.onboarding_completed,
-        created_at=current_user.created_at
-    )
+    return UserProfile.model_validate(current_user)
 
 
 @router.get("/me/trips")
@@ -107,7 +78,9 @@ async def get_my_trips(
     memberships = db.query(TripMember).filter(TripMember.user_id == current_user.id).all()
     trip_ids = [m.trip_id for m in memberships]
     
-    trips = db.query(Trip).filter(Trip.id.in_(trip_ids)).all() if trip_ids else []
+    # Only what the trip cards show
+    columns = (Trip.id, Trip.title, Trip.location, Trip.dates, Trip.image_url)
+    trips = db.query(*columns).filter(Trip.id.in_(trip_ids)).all() if trip_ids else []
     
     # Get pending join requests
     pending_requests = db.query(JoinRequest).filter(
@@ -115,7 +88,7 @@ async def get_my_trips(
         JoinRequest.status == "pending"
     ).all()
     pending_trip_ids = [r.trip_id for r in pending_requests]
-    pending_trips = db.query(Trip).filter(Trip.id.in_(pending_trip_ids)).all() if pending_trip_ids else []
+    pending_trips = db.query(*columns).filter(Trip.id.in_(pending_trip_ids)).all() if pending_trip_ids else []
     
     def format_trip(trip, trip_status):
         member_count = db.query(TripMember).filter(TripMember.trip_id == trip.id).count()
@@ -124,7 +97,7 @@ async def get_my_trips(
             "title": trip.title,
             "location": trip.location,
             "date": trip.dates or "",
-            "image_url": trip.image_url or "/images/trip-beach.png",
+            "image_url": blob_store.thumbnail_url(trip.image_url) or "/images/trip-beach.png",
             "status": trip_status,
             "member_count": member_count
         }
@@ -135,13 +108,12 @@ async def get_my_trips(
         "past": []  # Would need proper date parsing to determine past trips
     }
     
-    return result
+    return FastJSONResponse(result)
     
     
 from fastapi import File, UploadFile
-import shutil
-import os
 from app.config import get_settings
+from app.storage import UploadTooLarge
 
 settings = get_settings()
 
@@ -152,37 +124,18 @@ async def upload_avatar(
     db: Session = Depends(get_db)
 ):
     """Upload user avatar image."""
-    # Ensure uploads directory exists
-    os.makedirs("uploads", exist_ok=True)
-    
-    # Generate unique filename
-    file_extension = os.path.splitext(file.filename)[1]
-    filename = f"{current_user.id}_{int(datetime.utcnow().timestamp())}{file_extension}"
-    file_path = f"uploads/{filename}"
-    
-    # Save file
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
-        
-    # Update user profile
-    # Construct full URL
-    base_url = settings.backend_url # e.g. http://localhost:8000
-    avatar_url = f"{base_url}/static/{filename}"
+    # Streamed off the event loop; only a complete, sniffed image reaches uploads/
+    try:
+        blob = await blob_store.save_upload(file, max_bytes=settings.max_avatar_bytes)
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    avatar_url = blob.url
     
     current_user.avatar_url = avatar_url
     db.commit()
     db.refresh(current_user)
+    await notify_profile_changed(db, current_user)
     
-    return UserProfile(
-        id=current_user.id,
-        email=current_user.email,
-        display_name=current_user.display_name,
-        avatar_url=current_user.avatar_url,
-        location=current_user.location,
-        bio=current_user.bio,
-        age_range=current_user.age_range,
-        personality=current_user.personality,
-        interests=current_user.interests or [],
-        onboarding_completed=current_user.onboarding_completed,
-        created_at=current_user.created_at
-    )
+    return UserProfile.model_validate(current_user)
@@ -27,7 +27,22 @@ class MessageResponse(BaseModel):
 class MessageList(BaseModel):
     """Schema for list of messages."""
     messages: List[MessageResponse]
-    total: int
+    # Not counted for cursor (after/before) pages
+    total: Optional[int] = None
+    # More messages exist beyond this page, in the direction paged
+    has_more: bool = False
+
+
+class MessageSearchHit(MessageResponse):
+    """Schema for a search result: the message plus a highlighted excerpt."""
+    # HTML-escaped text with matched terms wrapped in <mark></mark>
+    snippet: str
+
+
+class MessageSearchList(BaseModel):
+    """Schema for a page of search results, newest first."""
+    results: List[MessageSearchHit]
+    has_more: bool = False
 
 
 class WebSocketMessage(BaseModel):
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, field_validator
 from typing import Optional, List
 from uuid import UUID
 from datetime import datetime
@@ -50,6 +50,12 @@ class UserProfile(BaseModel):
     
     class Config:
         from_attributes = True
+    
+    @field_validator("interests", mode="before")
+    @classmethod
+    def interests_default(cls, value):
+        """Users created before onboarding have NULL interests."""
+        return value or []
 
 
 class UserPublic(BaseModel):
@@ -0,0 +1,4 @@
+# Storage package
+from app.storage.backends import BlobBackend, LocalBackend, S3Backend, create_backend
+from app.storage.blobs import BlobStore, StoredBlob, UploadTooLarge, blob_store
+from app.storage.static import UploadStaticFiles
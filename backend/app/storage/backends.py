@@ -0,0 +1,108 @@
+import os
+from typing import Optional
+
+
+class BlobBackend:
+    """Where content-addressed blobs live. Keys are relative paths like 'ab/abcd....jpg'."""
+
+    def exists(self, key: str) -> bool:
+        raise NotImplementedError
+
+    def put_file(self, key: str, path: str, content_type: str):
+        """Store the file at path under key. The file may be moved or removed."""
+        raise NotImplementedError
+
+    def url(self, key: str) -> str:
+        """Public URL of a stored blob."""
+        raise NotImplementedError
+
+
+class LocalBackend(BlobBackend):
+    """Blobs on the local filesystem, served by the /static mount."""
+
+    def __init__(self, root: str, base_url: str):
+        self.root = root
+        self.base_url = base_url.rstrip("/")
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.root, key)
+
+    def exists(self, key: str) -> bool:
+        return os.path.exists(self.path(key))
+
+    def put_file(self, key: str, path: str, content_type: str):
+        target = self.path(key)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        # Atomic on the same filesystem: readers never see a partial blob
+        os.replace(path, target)
+
+    def url(self, key: str) -> str:
+        return f"{self.base_url}/{key}"
+
+
+class S3Backend(BlobBackend):
+    """
+    Blobs in an S3-compatible bucket (AWS S3, MinIO, a local stand-in).
+
+    boto3 is only imported when this backend is used; credentials come from the
+    usual AWS environment variables or config files.
+    """
+
+    def __init__(self, bucket: str, public_url: str, endpoint_url: Optional[str] = None, region: Optional[str] = None):
+        self.bucket = bucket
+        self.public_url = public_url.rstrip("/")
+        self.endpoint_url = endpoint_url or None
+        self.region = region or None
+        self._client = None
+
+    @property
+    def client(self):
+        if self._client is None:
+            import boto3
+
+            self._client = boto3.client("s3", endpoint_url=self.endpoint_url, region_name=self.region)
+        return self._client
+
+    def exists(self, key: str) -> bool:
+        from botocore.exceptions import ClientError
+
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=key)
+            return True
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+
+    def put_file(self, key: str, path: str, content_type: str):
+        # Content-addressed keys never change, so caches may keep them forever
+        self.client.upload_file(path, self.bucket, key, ExtraArgs={
+            "ContentType": content_type,
+            "CacheControl": "public, max-age=31536000, immutable"
+        })
+        os.remove(path)
+
+    def url(self, key: str) -> str:
+        return f"{self.public_url}/{key}"
+
+
+def create_backend(kind: str, settings) -> BlobBackend:
+    """Build the blob backend selected in settings ('local' or 's3')."""
+    if kind == "local":
+        return LocalBackend(os.path.join("uploads", "blobs"), f"{settings.backend_url}/static/blobs")
+    if kind == "s3":
+        public_url = settings.blob_s3_public_url
+        if not public_url:
+            # Path-style on a custom endpoint, virtual-hosted style on AWS
+            public_url = (
+                f"{settings.blob_s3_endpoint_url.rstrip('/')}/{settings.blob_s3_bucket}"
+                if settings.blob_s3_endpoint_url
+                else f"https://{settings.blob_s3_bucket}.s3.amazonaws.com"
+            )
+        return S3Backend(
+            settings.blob_s3_bucket,
+            public_url,
+            endpoint_url=settings.blob_s3_endpoint_url,
+            region=settings.blob_s3_region
+        )
+    raise ValueError(f"Unknown blob backend: {kind}")
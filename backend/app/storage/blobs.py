@@ -0,0 +1,195 @@
+import asyncio
+import hashlib
+import io
+import os
+import tempfile
+from typing import BinaryIO, NamedTuple, Optional, Set, Tuple
+from fastapi import UploadFile
+from starlette.datastructures import Headers
+from app.config import get_settings
+from app.storage.backends import BlobBackend, create_backend
+from app.storage.images import (
+    IMAGE_TYPES, VARIANTS, VARIANT_CONTENT_TYPE, get_pool, render_variants, thumbnail_url, variant_key
+)
+
+settings = get_settings()
+
+CHUNK_SIZE = 64 * 1024
+# Incoming files are staged here; same filesystem as uploads/, outside the /static mount
+TEMP_DIR = ".upload_tmp"
+
+# Stored file extension per content type
+EXTENSIONS = {
+    "image/jpeg": ".jpg",
+    "image/png": ".png",
+    "image/gif": ".gif",
+    "image/webp": ".webp",
+    "image/avif": ".avif",
+}
+
+# Leading bytes that identify a file's real type, whatever the client claims
+SNIFF_BYTES = 16
+MAGIC_NUMBERS = [
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+]
+# Stored files are world-readable, so a separate static server can serve them
+FILE_MODE = 0o644
+
+
+class UploadTooLarge(ValueError):
+    """An upload went over its byte limit."""
+
+
+class StoredBlob(NamedTuple):
+    key: str
+    url: str
+    size: int
+    content_type: str
+    digest: str
+
+
+def sniff_content_type(head: bytes) -> Optional[str]:
+    """Content type from a file's first bytes, or None if unrecognised."""
+    for magic, content_type in MAGIC_NUMBERS:
+        if head.startswith(magic):
+            return content_type
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    if head[4:12] in (b"ftypavif", b"ftypavis"):
+        return "image/avif"
+    return None
+
+
+def blob_key(digest: str, content_type: str) -> str:
+    """
+    Content-addressed key: identical bytes always map to the same blob.
+
+    The extension comes only from EXTENSIONS, never from the client's filename,
+    so the type a file is served as is always one we sniffed.
+    """
+    extension = EXTENSIONS.get(content_type)
+    if extension is None:
+        raise ValueError(f"Unsupported file type: {content_type}")
+    return f"{digest[:2]}/{digest}{extension}"
+
+
+class BlobStore:
+    """
+    Content-addressed blob storage.
+
+    Uploads are streamed in chunks to a temp file while being hashed, then
+    handed to the backend under their SHA-256 name. Re-uploading the same
+    bytes stores nothing new and returns the existing URL.
+    
+    Images also get size variants (see images.VARIANTS), rendered in a
+    process pool and named after the original's hash, so each distinct image
+    is decoded once however often it is uploaded.
+    """
+
+    def __init__(self, backend: BlobBackend, temp_dir: str = TEMP_DIR):
+        self.backend = backend
+        self.temp_dir = temp_dir
+
+    async def save_upload(
+        self,
+        upload: UploadFile,
+        max_bytes: Optional[int] = None,
+        allowed_types: Set[str] = IMAGE_TYPES
+    ) -> StoredBlob:
+        """
+        Stream an upload into the store.
+
+        Copying and hashing run on a worker thread, so large files never block
+        the event loop. Raises UploadTooLarge once more than max_bytes arrive,
+        and ValueError unless the file's leading bytes identify one of
+        allowed_types; the client's content type and filename are ignored.
+        """
+        if max_bytes is not None and upload.size is not None and upload.size > max_bytes:
+            raise UploadTooLarge(f"File is larger than {max_bytes} bytes")
+
+        os.makedirs(self.temp_dir, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=self.temp_dir)
+        try:
+            digest, size, head = await asyncio.to_thread(self._spool, upload.file, fd, max_bytes)
+
+            content_type = sniff_content_type(head)
+            if content_type not in allowed_types:
+                raise ValueError("Unsupported file type: upload a JPEG, PNG, GIF or WebP image")
+
+            key = blob_key(digest, content_type)
+            if content_type in IMAGE_TYPES:
+                # Before the original is stored, so a stored image always has its variants
+                await self._store_variants(digest, temp_path)
+            await asyncio.to_thread(self._store, key, temp_path, content_type)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+        return StoredBlob(key, self.backend.url(key), size, content_type, digest)
+
+    async def save_bytes(self, data: bytes, content_type: str) -> StoredBlob:
+        """Store in-memory bytes through the same path as an upload."""
+        upload = UploadFile(
+            io.BytesIO(data), size=len(data),
+            headers=Headers({"content-type": content_type})
+        )
+        return await self.save_upload(upload)
+
+    def _spool(self, source: BinaryIO, fd: int, max_bytes: Optional[int]) -> Tuple[str, int, bytes]:
+        """Copy source to the temp file fd in chunks. Returns (sha256, size, leading bytes)."""
+        digest = hashlib.sha256()
+        size = 0
+        head = b""
+        os.fchmod(fd, FILE_MODE)
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                chunk = source.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if max_bytes is not None and size > max_bytes:
+                    raise UploadTooLarge(f"File is larger than {max_bytes} bytes")
+                if len(head) < SNIFF_BYTES:
+                    head += chunk[:SNIFF_BYTES - len(head)]
+                digest.update(chunk)
+                out.write(chunk)
+        return digest.hexdigest(), size, head
+
+    def _store(self, key: str, temp_path: str, content_type: str):
+        if self.backend.exists(key):
+            # Same bytes already stored
+            return
+        self.backend.put_file(key, temp_path, content_type)
+    
+    async def _store_variants(self, digest: str, source_path: str):
+        """Render and store whichever size variants of an image are missing."""
+        keys = {name: variant_key(digest, name) for name in VARIANTS}
+        missing = {}
+        for name, key in keys.items():
+            if not await asyncio.to_thread(self.backend.exists, key):
+                missing[name] = VARIANTS[name]
+        if not missing:
+            return
+        
+        loop = asyncio.get_running_loop()
+        rendered = await loop.run_in_executor(
+            get_pool(settings.image_workers), render_variants, source_path, self.temp_dir, missing
+        )
+        try:
+            for name, path in rendered:
+                await asyncio.to_thread(self.backend.put_file, keys[name], path, VARIANT_CONTENT_TYPE)
+        finally:
+            for _, path in rendered:
+                if os.path.exists(path):
+                    os.remove(path)
+    
+    def thumbnail_url(self, url: Optional[str]) -> Optional[str]:
+        """Thumbnail variant of a stored image's URL; any other URL is returned as is."""
+        return thumbnail_url(url, self.backend.url(""))
+
+
+# Global blob store
+blob_store = BlobStore(create_backend(settings.blob_backend, settings))
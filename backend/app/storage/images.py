@@ -0,0 +1,90 @@
+import os
+import re
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+# Size variants generated for every uploaded image: name -> longest side in pixels
+VARIANTS = {
+    "thumb": 320,
+    "medium": 1280,
+}
+VARIANT_FORMAT = "WEBP"
+VARIANT_EXTENSION = ".webp"
+VARIANT_CONTENT_TYPE = "image/webp"
+VARIANT_QUALITY = 80
+
+# Content types the variant pipeline accepts
+IMAGE_TYPES = {"image/jpeg", "image/png", "image/gif", "image/webp"}
+
+# An original image blob key: "ab/<sha256>.<ext>"
+_IMAGE_KEY = re.compile(r"(?P<prefix>[0-9a-f]{2})/(?P<digest>[0-9a-f]{64})\.(jpg|png|gif|webp)")
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def variant_key(digest: str, variant: str) -> str:
+    """Deterministic key of an image variant, derived from the original's hash."""
+    return f"{digest[:2]}/{digest}_{variant}{VARIANT_EXTENSION}"
+
+
+def get_pool(workers: int) -> ProcessPoolExecutor:
+    """Process pool for image work, created on first use."""
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=workers)
+    return _pool
+
+
+def shutdown_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=True, cancel_futures=True)
+        _pool = None
+
+
+def render_variants(source_path: str, temp_dir: str, variants: Dict[str, int]) -> List[Tuple[str, str]]:
+    """
+    Decode an image once and write each size variant to a temp file.
+
+    Runs in a worker process. Returns (variant name, temp path) pairs; raises
+    ValueError if the file is not a readable image or has more pixels than
+    Pillow's decompression bomb limit.
+    """
+    from PIL import Image, ImageOps, UnidentifiedImageError
+
+    try:
+        with Image.open(source_path) as image:
+            # Let JPEG decode at reduced scale when even the largest variant is smaller
+            image.draft("RGB", (max(variants.values()),) * 2)
+            image = ImageOps.exif_transpose(image)
+            image = image.convert("RGBA" if image.mode in ("RGBA", "LA", "P") else "RGB")
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError) as e:
+        raise ValueError(f"Not a readable image: {e}")
+
+    results = []
+    # Largest first, so each smaller variant is resized from the previous one
+    for name, size in sorted(variants.items(), key=lambda item: item[1], reverse=True):
+        image.thumbnail((size, size), Image.LANCZOS)
+        fd, path = tempfile.mkstemp(dir=temp_dir, suffix=VARIANT_EXTENSION)
+        # mkstemp creates 0600; stored files must be readable by a static server
+        os.fchmod(fd, 0o644)
+        with os.fdopen(fd, "wb") as out:
+            image.save(out, VARIANT_FORMAT, quality=VARIANT_QUALITY, method=4)
+        results.append((name, path))
+    return results
+
+
+def thumbnail_url(url: Optional[str], base_url: str) -> Optional[str]:
+    """
+    The thumbnail variant of an uploaded image URL.
+
+    URLs that are not image blobs from this store (external links, legacy data
+    URIs, bundled placeholders) are returned unchanged.
+    """
+    if not url or not url.startswith(base_url):
+        return url
+    match = _IMAGE_KEY.fullmatch(url[len(base_url):])
+    if match is None:
+        return url
+    return f"{base_url}{variant_key(match.group('digest'), 'thumb')}"
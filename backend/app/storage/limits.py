@@ -0,0 +1,83 @@
+from typing import Dict
+import orjson
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Room for multipart boundaries and part headers around the file itself
+MULTIPART_OVERHEAD = 64 * 1024
+
+
+class _BodyTooLarge(Exception):
+    pass
+
+
+class UploadSizeLimit:
+    """
+    Reject oversized request bodies on upload routes before they are parsed.
+
+    FastAPI spools a multipart file to disk in full before the endpoint runs, so
+    limits checked in the endpoint come too late to protect the disk. This
+    middleware answers 413 from Content-Length alone, and for bodies without one
+    counts bytes as they are received and stops reading once over the limit.
+    """
+
+    def __init__(self, app: ASGIApp, limits: Dict[str, int]):
+        self.app = app
+        # Path -> maximum body size in bytes
+        self.limits = {path: size + MULTIPART_OVERHEAD for path, size in limits.items()}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        limit = self.limits.get(scope.get("path")) if scope["type"] == "http" else None
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+
+        for name, value in scope["headers"]:
+            if name == b"content-length":
+                if not value.isdigit() or int(value) > limit:
+                    await self._reject(send, limit)
+                    return
+                break
+
+        received = 0
+        response_started = False
+        rejected = False
+
+        async def limited_receive() -> Message:
+            nonlocal received, rejected
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    # Answer here: the body parser turns any receive error into a 400
+                    if not response_started and not rejected:
+                        rejected = True
+                        await self._reject(send, limit)
+                    raise _BodyTooLarge()
+            return message
+
+        async def tracked_send(message: Message):
+            nonlocal response_started
+            if rejected:
+                # The 413 has been sent; drop the app's own error response
+                return
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, tracked_send)
+        except _BodyTooLarge:
+            pass
+
+    async def _reject(self, send: Send, limit: int):
+        body = orjson.dumps({"detail": f"Request body is larger than {limit} bytes"})
+        await send({
+            "type": "http.response.start",
+            "status": 413,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"connection", b"close"),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
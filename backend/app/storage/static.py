@@ -0,0 +1,99 @@
+import mimetypes
+import os
+import re
+from typing import Optional, Tuple
+from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse
+from starlette.types import Scope
+
+# Content-addressed blobs and their variants: "<sha256>[_variant][.ext]"
+_CONTENT_NAME = re.compile(r"(?P<stem>[0-9a-f]{64}(?:_[a-z]+)?)(?:\.[a-z0-9]+)?")
+
+# Never change once written, so browsers and CDNs may keep them for a year
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+
+# Precompressed siblings ("logo.svg.br"), in order of preference
+ENCODINGS = [("br", ".br"), ("gzip", ".gz")]
+
+
+def _accepts(accept_encoding: str, encoding: str) -> bool:
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        if name.strip() == encoding:
+            return params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    return False
+
+
+class UploadStaticFiles(StaticFiles):
+    """
+    StaticFiles for the uploads/ directory, tuned for long-lived caching.
+
+    Content-named blobs get their hash as a strong ETag and an immutable
+    Cache-Control, so repeat loads are served from the client cache without a
+    request. Other uploads keep Starlette's size/mtime ETag and a short max-age.
+    If a client accepts it and a ".br" or ".gz" sibling exists, that file is
+    sent instead. Range requests and zero-copy pathsend come from FileResponse.
+    """
+
+    def __init__(self, *args, max_age: int = 3600, precompressed: bool = True, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.max_age = max_age
+        self.precompressed = precompressed
+
+    def file_response(
+        self,
+        full_path,
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200
+    ) -> Response:
+        request_headers = Headers(scope=scope)
+        # Typed by the original name, whichever encoding is sent
+        media_type = mimetypes.guess_type(str(full_path))[0] or "application/octet-stream"
+        encoding, path, stat_result = self._select_encoding(
+            str(full_path), stat_result, request_headers.get("accept-encoding", "")
+        )
+
+        headers = {
+            "x-content-type-options": "nosniff",
+            # Uploads are only ever embedded as images; anything opened directly
+            # (e.g. HTML or SVG stored before uploads were restricted) cannot run script
+            "content-security-policy": "default-src 'none'; style-src 'unsafe-inline'; sandbox",
+        }
+        match = _CONTENT_NAME.fullmatch(os.path.basename(str(full_path)))
+        if match:
+            suffix = f"-{encoding}" if encoding else ""
+            headers["etag"] = f'"{match.group("stem")}{suffix}"'
+            headers["cache-control"] = IMMUTABLE_CACHE
+        else:
+            headers["cache-control"] = f"public, max-age={self.max_age}"
+        if encoding:
+            headers["content-encoding"] = encoding
+        if self.precompressed:
+            headers["vary"] = "Accept-Encoding"
+
+        response = FileResponse(
+            path, status_code=status_code, headers=headers, media_type=media_type, stat_result=stat_result
+        )
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
+
+    def _select_encoding(
+        self,
+        full_path: str,
+        stat_result: os.stat_result,
+        accept_encoding: str
+    ) -> Tuple[Optional[str], str, os.stat_result]:
+        """Pick a precompressed sibling the client accepts, falling back to the file itself."""
+        if self.precompressed and accept_encoding:
+            for encoding, extension in ENCODINGS:
+                if not _accepts(accept_encoding, encoding):
+                    continue
+                try:
+                    return encoding, full_path + extension, os.stat(full_path + extension)
+                except OSError:
+                    continue
+        return None, full_path, stat_result
@@ -0,0 +1,23 @@
+from typing import Any
+import orjson
+from fastapi.datastructures import Default
+from fastapi.responses import JSONResponse
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response rendered with orjson.
+
+    orjson encodes UUIDs and datetimes itself, so endpoints that build plain
+    dicts can return FastJSONResponse(payload) directly and skip FastAPI's
+    jsonable_encoder pass, which costs more than the encoding.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+# App-wide default. Wrapped in Default so routes with a response_model keep
+# FastAPI's own path (Pydantic validates and dumps straight to JSON bytes);
+# only routes returning plain data are rendered by FastJSONResponse.
+DEFAULT_RESPONSE_CLASS = Default(FastJSONResponse)
@@ -0,0 +1,148 @@
+from datetime import datetime
+from typing import Dict, Iterable, List
+from uuid import UUID
+from sqlalchemy import bindparam, func, or_, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from app.models.message import Message
+from app.models.trip import Trip
+from app.models.trip_member import TripMember
+from app.models.trip_room_summary import TripRoomSummary
+
+# Enough of the last message for any list preview
+PREVIEW_CHARS = 200
+
+
+def record_messages(db: Session, rows: List[dict]):
+    """
+    Point each trip's summary at its newest message among rows.
+
+    Runs in the caller's transaction, so the summary commits with the messages.
+    A summary never moves back to an older message when batches race. Trips
+    without a summary yet (e.g. inserted by seed scripts) get one created.
+    """
+    newest: Dict[UUID, dict] = {}
+    for row in rows:
+        current = newest.get(row["trip_id"])
+        if current is None or row["created_at"] >= current["created_at"]:
+            newest[row["trip_id"]] = row
+    if not newest:
+        return
+
+    summaries = TripRoomSummary.__table__
+    statement = (
+        update(summaries).where(
+            summaries.c.trip_id == bindparam("b_trip_id"),
+            or_(
+                summaries.c.last_message_at.is_(None),
+                summaries.c.last_message_at <= bindparam("b_created_at")
+            )
+        ).values(
+            last_message_id=bindparam("b_id"),
+            last_message_content=bindparam("b_content"),
+            last_sender_id=bindparam("b_sender_id"),
+            last_message_at=bindparam("b_created_at"),
+            updated_at=datetime.utcnow()
+        )
+    )
+    params = [
+        {
+            "b_trip_id": row["trip_id"],
+            "b_id": row["id"],
+            "b_content": row["content"][:PREVIEW_CHARS],
+            "b_sender_id": row["sender_id"],
+            "b_created_at": row["created_at"]
+        }
+        for row in newest.values()
+    ]
+    updated = db.execute(statement, params).rowcount
+    if updated != len(newest):
+        # Some summaries are missing (or the driver cannot count an executemany):
+        # create them, then repeat the update so a row created concurrently by
+        # another writer also moves forward
+        create_missing_summaries(db, newest.keys())
+        db.execute(statement, params)
+
+
+def _summary_values(db: Session, trip_id) -> dict:
+    """Compute a trip's summary row from scratch."""
+    member_count = db.query(func.count(TripMember.id)).filter(TripMember.trip_id == trip_id).scalar()
+    last = db.query(Message.id, Message.content, Message.sender_id, Message.created_at).filter(
+        Message.trip_id == trip_id
+    ).order_by(Message.created_at.desc(), Message.id.desc()).first()
+
+    return {
+        "trip_id": trip_id,
+        "member_count": member_count,
+        "last_message_id": last.id if last else None,
+        "last_message_content": last.content[:PREVIEW_CHARS] if last else None,
+        "last_sender_id": last.sender_id if last else None,
+        "last_message_at": last.created_at if last else None
+    }
+
+
+def _insert_ignoring_existing(db: Session):
+    """INSERT into trip_room_summary that skips trips which already have a row."""
+    summaries = TripRoomSummary.__table__
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert(summaries).on_conflict_do_nothing(index_elements=["trip_id"])
+    if dialect == "sqlite":
+        return sqlite.insert(summaries).on_conflict_do_nothing(index_elements=["trip_id"])
+    return summaries.insert()
+
+
+def create_missing_summaries(db: Session, trip_ids: Iterable) -> int:
+    """
+    Create summaries for whichever of trip_ids have none, in the caller's transaction.
+
+    Safe against concurrent writers and workers: a row created by someone else in
+    the meantime is kept. Returns the number of summaries computed.
+    """
+    trip_ids = list(trip_ids)
+    existing = {
+        row.trip_id for row in
+        db.query(TripRoomSummary.trip_id).filter(TripRoomSummary.trip_id.in_(trip_ids)).all()
+    }
+    missing = [trip_id for trip_id in trip_ids if trip_id not in existing]
+    if missing:
+        db.execute(_insert_ignoring_existing(db), [_summary_values(db, trip_id) for trip_id in missing])
+    return len(missing)
+
+
+def refresh_member_count(db: Session, trip_id):
+    """
+    Recount a trip's members after a membership change, in the caller's transaction.
+
+    The summary row is locked before counting, so concurrent membership changes
+    recount one after another and each count (a fresh READ COMMITTED snapshot)
+    includes the members committed by the one before it.
+    """
+    # Pending member rows must be visible to the count
+    db.flush()
+    summaries = TripRoomSummary.__table__
+    lock = select(summaries.c.trip_id).where(summaries.c.trip_id == trip_id).with_for_update()
+    if db.execute(lock).first() is None:
+        # A concurrent insert of the same row waits for the other transaction to
+        # commit and is skipped, so the row exists and can be locked afterwards
+        create_missing_summaries(db, [trip_id])
+        db.execute(lock)
+    member_count = select(func.count(TripMember.id)).where(
+        TripMember.trip_id == trip_id
+    ).scalar_subquery()
+    db.execute(
+        update(summaries).where(summaries.c.trip_id == trip_id).values(
+            member_count=member_count,
+            updated_at=datetime.utcnow()
+        )
+    )
+
+
+def backfill_room_summaries(db: Session) -> int:
+    """Create summaries for trips that predate the table. Returns the number created."""
+    missing = db.query(Trip.id).outerjoin(
+        TripRoomSummary, TripRoomSummary.trip_id == Trip.id
+    ).filter(TripRoomSummary.trip_id.is_(None)).all()
+    created = create_missing_summaries(db, [row.id for row in missing]) if missing else 0
+    db.commit()
+    return created
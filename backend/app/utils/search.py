@@ -0,0 +1,57 @@
+import html
+from typing import Tuple
+from sqlalchemy import column, func, literal_column, table
+from sqlalchemy.orm import Query, Session
+from app.models.message import Message
+
+# Highlight markers around matched terms in snippets
+MARK_START = "<mark>"
+MARK_END = "</mark>"
+# What the database wraps matches in: private-use characters that survive HTML
+# escaping, swapped for the real markers once the text is escaped
+_SENTINEL_START = "\ue000"
+_SENTINEL_END = "\ue001"
+
+# Must match the GIN index expression (see the Alembic revision) for the planner to use it
+POSTGRES_CONFIG = literal_column("'simple'::regconfig")
+
+
+def _fts5_query(q: str) -> str:
+    """Quote each word so user input is matched literally (all words must match)."""
+    return " ".join('"' + word.replace('"', '""') + '"' for word in q.split())
+
+
+def search_filter(db: Session, query: Query, q: str) -> Tuple[Query, object]:
+    """
+    Restrict a Message query to full-text matches for q.
+
+    Returns the filtered query and a snippet column; pass its values through
+    highlight() to get HTML-escaped text with matches wrapped in MARK_START/MARK_END.
+    """
+    dialect = db.get_bind().dialect.name
+
+    if dialect == "postgresql":
+        ts_query = func.websearch_to_tsquery(POSTGRES_CONFIG, q)
+        match = func.to_tsvector(POSTGRES_CONFIG, Message.content).op("@@")(ts_query)
+        snippet = func.ts_headline(
+            POSTGRES_CONFIG, Message.content, ts_query,
+            f"StartSel={_SENTINEL_START}, StopSel={_SENTINEL_END}, MaxWords=20, MinWords=8"
+        )
+        return query.filter(match), snippet
+
+    if dialect == "sqlite":
+        fts = table("messages_fts", column("rowid"))
+        fts_name = literal_column("messages_fts")
+        query = query.join(
+            fts, fts.c.rowid == literal_column("messages.rowid")
+        ).filter(fts_name.op("MATCH")(_fts5_query(q)))
+        snippet = func.snippet(fts_name, 0, _SENTINEL_START, _SENTINEL_END, "...", 16)
+        return query, snippet
+
+    # No text index on other databases: unindexed substring match
+    return query.filter(Message.content.ilike(f"%{q}%")), Message.content
+
+
+def highlight(snippet: str) -> str:
+    """HTML-escape a snippet from search_filter, then mark its matched terms."""
+    return html.escape(snippet).replace(_SENTINEL_START, MARK_START).replace(_SENTINEL_END, MARK_END)
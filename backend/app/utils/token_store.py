@@ -0,0 +1,76 @@
+import uuid
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy.orm import Session
+from app.config import get_settings
+from app.models.refresh_token import RefreshToken
+from app.utils.security import create_refresh_token
+
+settings = get_settings()
+
+
+def issue_refresh_token(db: Session, user_id, family_id: Optional[uuid.UUID] = None) -> str:
+    """Record a new refresh token id and return the signed token."""
+    token = RefreshToken(
+        id=uuid.uuid4(),
+        family_id=family_id or uuid.uuid4(),
+        user_id=user_id,
+        expires_at=datetime.utcnow() + timedelta(days=settings.refresh_token_expire_days)
+    )
+    db.add(token)
+    db.commit()
+
+    return create_refresh_token(data={
+        "sub": str(user_id),
+        "jti": str(token.id),
+        "fam": str(token.family_id)
+    })
+
+
+def revoke_family(db: Session, family_id) -> int:
+    """Revoke every token in a family. Returns the number of tokens revoked."""
+    revoked = db.query(RefreshToken).filter(
+        RefreshToken.family_id == uuid.UUID(str(family_id)),
+        RefreshToken.revoked_at.is_(None)
+    ).update({RefreshToken.revoked_at: datetime.utcnow()}, synchronize_session=False)
+    db.commit()
+    return revoked
+
+
+def rotate_refresh_token(db: Session, payload: dict) -> Optional[str]:
+    """
+    Exchange a verified refresh token payload for a new token in the same family.
+
+    Returns None when the token was already used or revoked; in that case the
+    whole family is revoked, since reuse means the token has leaked. Tokens
+    issued before rotation (no jti) are refused too, so they need a new login.
+    """
+    user_id = payload.get("sub")
+    token_id = payload.get("jti")
+    family_id = payload.get("fam")
+
+    if not token_id or not family_id:
+        return None
+
+    # Conditional update: a used or revoked token matches no row, and concurrent
+    # refreshes (on any worker) cannot both win
+    rotated = db.query(RefreshToken).filter(
+        RefreshToken.id == uuid.UUID(token_id),
+        RefreshToken.revoked_at.is_(None)
+    ).update({RefreshToken.revoked_at: datetime.utcnow()}, synchronize_session=False)
+    db.commit()
+
+    if not rotated:
+        revoke_family(db, family_id)
+        return None
+
+    return issue_refresh_token(db, user_id, family_id=uuid.UUID(family_id))
+
+
+def purge_expired_tokens(db: Session) -> int:
+    """Delete refresh token records past their expiry. Returns the number deleted."""
+    deleted = db.query(RefreshToken).filter(
+        RefreshToken.expires_at < datetime.utcnow()
+    ).delete(synchronize_session=False)
+    db.commit()
+    return deleted
@@ -0,0 +1,379 @@
+import asyncio
+from typing import Callable, Dict, List, Optional, Set
+from urllib.parse import urlparse
+
+# Called with (trip_id, payload) for every message published by any worker
+MessageHandler = Callable[[str, str], None]
+
+CHANNEL_PREFIX = "howl_chat_"
+
+
+class Backplane:
+    """Pub/sub channel shared by all worker processes, one channel per chat room."""
+
+    # Largest payload publish() accepts, in UTF-8 bytes (None: no limit)
+    max_payload_bytes: Optional[int] = None
+
+    async def start(self, on_message: MessageHandler):
+        """Connect and start delivering published messages to on_message."""
+        raise NotImplementedError
+
+    async def stop(self):
+        """Disconnect."""
+        raise NotImplementedError
+
+    async def subscribe(self, trip_id: str):
+        """Start receiving a room's messages (a local member connected)."""
+        raise NotImplementedError
+
+    async def unsubscribe(self, trip_id: str):
+        """Stop receiving a room's messages (its last local member left)."""
+        raise NotImplementedError
+
+    async def publish(self, trip_id: str, payload: str):
+        """Publish a payload to every worker subscribed to the room."""
+        raise NotImplementedError
+
+
+class InMemoryBackplane(Backplane):
+    """
+    Process-local backplane.
+
+    Instances created in the same process share one hub, so several
+    ConnectionManagers can stand in for separate workers in tests.
+    """
+
+    _hub: Dict[str, Set["InMemoryBackplane"]] = {}
+
+    def __init__(self):
+        self._on_message: Optional[MessageHandler] = None
+        self._rooms: Set[str] = set()
+
+    async def start(self, on_message: MessageHandler):
+        self._on_message = on_message
+
+    async def stop(self):
+        for trip_id in list(self._rooms):
+            await self.unsubscribe(trip_id)
+        self._on_message = None
+
+    async def subscribe(self, trip_id: str):
+        self._rooms.add(trip_id)
+        self._hub.setdefault(trip_id, set()).add(self)
+
+    async def unsubscribe(self, trip_id: str):
+        self._rooms.discard(trip_id)
+        subscribers = self._hub.get(trip_id)
+        if subscribers is not None:
+            subscribers.discard(self)
+            if not subscribers:
+                del self._hub[trip_id]
+
+    async def publish(self, trip_id: str, payload: str):
+        for subscriber in list(self._hub.get(trip_id, ())):
+            if subscriber._on_message is not None:
+                subscriber._on_message(trip_id, payload)
+
+
+class PostgresBackplane(Backplane):
+    """Backplane over Postgres LISTEN/NOTIFY, using the app's own database."""
+
+    # NOTIFY payloads must be shorter than 8000 bytes
+    max_payload_bytes = 7999
+    RECONNECT_DELAY_SECONDS = 1.0
+    MAX_RECONNECT_DELAY_SECONDS = 30.0
+
+    def __init__(self, dsn: str):
+        self.dsn = dsn
+        self._on_message: Optional[MessageHandler] = None
+        self._rooms: Set[str] = set()
+        self._listen_conn = None
+        self._publish_conn = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._reconnect_task: Optional[asyncio.Task] = None
+        # Held while a LISTEN/UNLISTEN runs on a worker thread; the listen
+        # connection is never used from two threads at once
+        self._listen_lock = asyncio.Lock()
+
+    def _connect(self):
+        import psycopg2
+        from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+
+        conn = psycopg2.connect(self.dsn)
+        conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+        return conn
+
+    async def start(self, on_message: MessageHandler):
+        self._on_message = on_message
+        self._loop = asyncio.get_running_loop()
+        self._publish_conn = await asyncio.to_thread(self._connect)
+        await self._open_listen()
+
+    async def stop(self):
+        if self._reconnect_task is not None:
+            self._reconnect_task.cancel()
+            try:
+                await self._reconnect_task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._reconnect_task = None
+        self._close_listen()
+        if self._publish_conn is not None:
+            self._publish_conn.close()
+            self._publish_conn = None
+
+    async def _open_listen(self):
+        """Connect the listen socket and LISTEN on every subscribed room."""
+        conn = await asyncio.to_thread(self._connect)
+        rooms = list(self._rooms)
+        if rooms:
+            statement = "; ".join(f'LISTEN "{CHANNEL_PREFIX}{trip_id}"' for trip_id in rooms)
+            try:
+                await asyncio.to_thread(self._execute, conn, statement)
+            except Exception:
+                conn.close()
+                raise
+        self._listen_conn = conn
+        # Notifications arrive on the listen socket; read them from the event loop
+        self._loop.add_reader(conn.fileno(), self._drain_notifies)
+
+    def _close_listen(self):
+        conn, self._listen_conn = self._listen_conn, None
+        if conn is None:
+            return
+        try:
+            self._loop.remove_reader(conn.fileno())
+        except Exception:
+            # The socket is already gone
+            pass
+        conn.close()
+
+    def _connection_lost(self, error: Exception):
+        """Drop the dead listen connection and reconnect in the background."""
+        print(f"Backplane: Postgres listen connection error: {error}")
+        self._close_listen()
+        if self._reconnect_task is None or self._reconnect_task.done():
+            self._reconnect_task = self._loop.create_task(self._reconnect_loop())
+
+    async def _reconnect_loop(self):
+        delay = self.RECONNECT_DELAY_SECONDS
+        while True:
+            await asyncio.sleep(delay)
+            try:
+                async with self._listen_lock:
+                    await self._open_listen()
+                print("Backplane: Postgres listen connection restored")
+                return
+            except Exception as e:
+                print(f"Backplane: Postgres reconnect failed: {e}")
+                delay = min(delay * 2, self.MAX_RECONNECT_DELAY_SECONDS)
+
+    def _drain_notifies(self):
+        if self._listen_conn is None or self._listen_lock.locked():
+            # A LISTEN is in flight on a worker thread; its notifies are drained after it
+            return
+        try:
+            self._listen_conn.poll()
+        except Exception as e:
+            self._connection_lost(e)
+            return
+
+        while self._listen_conn.notifies:
+            notify = self._listen_conn.notifies.pop(0)
+            if notify.channel.startswith(CHANNEL_PREFIX):
+                self._on_message(notify.channel[len(CHANNEL_PREFIX):], notify.payload)
+
+    @staticmethod
+    def _execute(conn, statement: str, params: tuple = None):
+        with conn.cursor() as cursor:
+            cursor.execute(statement, params)
+
+    async def _execute_listen(self, statement: str):
+        async with self._listen_lock:
+            if self._listen_conn is None:
+                # Reconnecting; the new connection listens on self._rooms
+                return
+            try:
+                await asyncio.to_thread(self._execute, self._listen_conn, statement)
+            except Exception as e:
+                self._connection_lost(e)
+                return
+        # Deliver anything that arrived while the statement ran
+        self._drain_notifies()
+
+    async def subscribe(self, trip_id: str):
+        self._rooms.add(trip_id)
+        await self._execute_listen(f'LISTEN "{CHANNEL_PREFIX}{trip_id}"')
+
+    async def unsubscribe(self, trip_id: str):
+        self._rooms.discard(trip_id)
+        await self._execute_listen(f'UNLISTEN "{CHANNEL_PREFIX}{trip_id}"')
+
+    def _notify(self, trip_id: str, payload: str):
+        if self._publish_conn is None or self._publish_conn.closed:
+            self._publish_conn = self._connect()
+        self._execute(self._publish_conn, "SELECT pg_notify(%s, %s)", (f"{CHANNEL_PREFIX}{trip_id}", payload))
+
+    async def publish(self, trip_id: str, payload: str):
+        # Senders publish larger messages by reference (see ConnectionManager); never truncate
+        if len(payload.encode("utf-8")) > self.max_payload_bytes:
+            raise ValueError(f"Payload exceeds the {self.max_payload_bytes}-byte NOTIFY limit")
+        await asyncio.to_thread(self._notify, trip_id, payload)
+
+
+def _encode_command(*args: str) -> bytes:
+    """Encode a command as a RESP array of bulk strings."""
+    parts = [f"*{len(args)}\r\n".encode()]
+    for arg in args:
+        data = arg.encode("utf-8")
+        parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+    return b"".join(parts)
+
+
+async def _read_reply(reader: asyncio.StreamReader):
+    """Read one RESP2 reply."""
+    line = await reader.readline()
+    if not line:
+        raise ConnectionError("Connection closed by server")
+
+    prefix, body = line[:1], line[1:-2]
+    if prefix == b"+":
+        return body.decode()
+    if prefix == b"-":
+        raise RuntimeError(body.decode())
+    if prefix == b":":
+        return int(body)
+    if prefix == b"$":
+        length = int(body)
+        if length == -1:
+            return None
+        data = await reader.readexactly(length + 2)
+        return data[:-2].decode("utf-8")
+    if prefix == b"*":
+        length = int(body)
+        if length == -1:
+            return None
+        return [await _read_reply(reader) for _ in range(length)]
+    raise RuntimeError(f"Unexpected reply: {line!r}")
+
+
+class RedisBackplane(Backplane):
+    """
+    Backplane over the Redis pub/sub protocol (RESP2).
+
+    Speaks the wire protocol directly, so it works against Redis or any
+    compatible stand-in (KeyDB, Dragonfly, a local test server).
+    """
+
+    RECONNECT_DELAY_SECONDS = 1.0
+
+    def __init__(self, url: str):
+        parsed = urlparse(url or "redis://localhost:6379/0")
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.password = parsed.password
+        self._on_message: Optional[MessageHandler] = None
+        self._rooms: Set[str] = set()
+        self._sub_writer: Optional[asyncio.StreamWriter] = None
+        self._pub_writer: Optional[asyncio.StreamWriter] = None
+        self._tasks: List[asyncio.Task] = []
+        self._connected = asyncio.Event()
+
+    async def _open(self):
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        if self.password:
+            writer.write(_encode_command("AUTH", self.password))
+            await writer.drain()
+            await _read_reply(reader)
+        return reader, writer
+
+    async def start(self, on_message: MessageHandler):
+        self._on_message = on_message
+        self._tasks = [
+            asyncio.create_task(self._subscriber_loop()),
+            asyncio.create_task(self._publisher_loop()),
+        ]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except (asyncio.CancelledError, Exception):
+                pass
+        self._tasks = []
+        for writer in (self._sub_writer, self._pub_writer):
+            if writer is not None:
+                writer.close()
+        self._sub_writer = self._pub_writer = None
+
+    async def _subscriber_loop(self):
+        while True:
+            try:
+                reader, self._sub_writer = await self._open()
+                # Resubscribe after (re)connecting
+                if self._rooms:
+                    channels = [f"{CHANNEL_PREFIX}{trip_id}" for trip_id in self._rooms]
+                    self._sub_writer.write(_encode_command("SUBSCRIBE", *channels))
+                    await self._sub_writer.drain()
+
+                while True:
+                    reply = await _read_reply(reader)
+                    if isinstance(reply, list) and len(reply) == 3 and reply[0] == "message":
+                        channel, payload = reply[1], reply[2]
+                        if channel.startswith(CHANNEL_PREFIX):
+                            self._on_message(channel[len(CHANNEL_PREFIX):], payload)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Backplane: Redis subscriber error: {e}")
+                self._sub_writer = None
+                await asyncio.sleep(self.RECONNECT_DELAY_SECONDS)
+
+    async def _publisher_loop(self):
+        while True:
+            try:
+                reader, self._pub_writer = await self._open()
+                self._connected.set()
+                # PUBLISH replies are only receiver counts; read and discard them
+                while True:
+                    await _read_reply(reader)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Backplane: Redis publisher error: {e}")
+                self._connected.clear()
+                self._pub_writer = None
+                await asyncio.sleep(self.RECONNECT_DELAY_SECONDS)
+
+    async def _send_subscription(self, command: str, trip_id: str):
+        if self._sub_writer is not None:
+            self._sub_writer.write(_encode_command(command, f"{CHANNEL_PREFIX}{trip_id}"))
+            await self._sub_writer.drain()
+
+    async def subscribe(self, trip_id: str):
+        self._rooms.add(trip_id)
+        await self._send_subscription("SUBSCRIBE", trip_id)
+
+    async def unsubscribe(self, trip_id: str):
+        self._rooms.discard(trip_id)
+        await self._send_subscription("UNSUBSCRIBE", trip_id)
+
+    async def publish(self, trip_id: str, payload: str):
+        if not self._connected.is_set():
+            print(f"Backplane: Redis unavailable, message for trip {trip_id} delivered locally only")
+            return
+        self._pub_writer.write(_encode_command("PUBLISH", f"{CHANNEL_PREFIX}{trip_id}", payload))
+        await self._pub_writer.drain()
+
+
+def create_backplane(kind: str, url: str = "") -> Backplane:
+    """Build the backplane selected in settings ('memory', 'postgres' or 'redis')."""
+    if kind == "memory":
+        return InMemoryBackplane()
+    if kind == "postgres":
+        return PostgresBackplane(url)
+    if kind == "redis":
+        return RedisBackplane(url)
+    raise ValueError(f"Unknown chat backplane: {kind}")
@@ -1,87 +1,518 @@
 from fastapi import WebSocket, WebSocketDisconnect, Depends
+from sqlalchemy import tuple_
 from sqlalchemy.orm import Session
-from typing import Dict, List, Set
-from uuid import UUID
+from typing import Deque, Dict, List, Optional, Set, Tuple
+from uuid import UUID, uuid4
+import asyncio
 import json
+import time
+import orjson
+from collections import deque
 from datetime import datetime
-from app.database import SessionLocal
+from app.config import get_settings
+from app.database import SessionLocal, engine
 from app.models.user import User
 from app.models.message import Message
 from app.models.trip_member import TripMember
 from app.utils.security import verify_access_token
+from app.websocket.backplane import Backplane, create_backplane
+from app.websocket.frames import Frame, ENCODING_JSON, ENCODING_MSGPACK, decode_client_frame
+from app.websocket.persistence import message_writer
+from app.websocket.presence import PresenceTracker
+from app.websocket.receipts import read_marker
+from app.storage import blob_store
+from app.websocket.typing import TypingTracker
+
+settings = get_settings()
+
+# Coalesced typing indicators; each typer's own connections get a copy without them
+TYPING_UPDATE = "typing_update"
+TYPING_UPDATE_PREFIX = f'{{"type":"{TYPING_UPDATE}"'
+# A message too large for the backplane, published by id; receivers load it from the DB
+MESSAGE_REF = "message_ref"
+MESSAGE_REF_PREFIX = f'{{"type":"{MESSAGE_REF}"'
+# Write-behind means the row may not be committed yet when the reference arrives
+MESSAGE_REF_ATTEMPTS = 5
+MESSAGE_REF_RETRY_SECONDS = 0.2
+# Frame type that also refreshes the cached identity of the user's connections
+PROFILE_UPDATED = "profile_updated"
+# Frames serialize "type" first, so remote frames are recognisable by prefix
+PROFILE_UPDATED_PREFIX = f'{{"type":"{PROFILE_UPDATED}"'
+MESSAGE_PREFIX = '{"type":"message"'
+# Worker-to-worker presence traffic; never forwarded to sockets
+PRESENCE = "presence"
+PRESENCE_SYNC = "presence_sync"
+PRESENCE_PREFIX = f'{{"type":"{PRESENCE}",'
+PRESENCE_SYNC_PREFIX = f'{{"type":"{PRESENCE_SYNC}"'
+# Users per presence frame
+PRESENCE_BATCH_SIZE = 20
+
+
+# Shared heartbeat frame, encoded once for every socket
+PING_FRAME = Frame({"type": "ping"})
+
+
+class ClientConnection:
+    """A chat socket with its own bounded outbound queue and writer task."""
+    
+    # Compact per-connection record; there can be a lot of these per node
+    __slots__ = (
+        "websocket", "trip_id", "user_info", "binary", "queue", "writer", "closed", "last_seen", "answers_pings"
+    )
+    
+    def __init__(self, websocket: WebSocket, trip_id: str, user_info: dict, binary: bool = False):
+        self.websocket = websocket
+        self.trip_id = trip_id
+        self.user_info = user_info
+        # Client negotiated the compact binary encoding
+        self.binary = binary
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=settings.ws_send_queue_size)
+        self.writer: Optional[asyncio.Task] = None
+        self.closed = False
+        # Monotonic time of the last frame received from the client
+        self.last_seen = time.monotonic()
+        # Client has replied to an app-level ping, so silence from it means trouble
+        self.answers_pings = False
 
 
 class ConnectionManager:
     """Manages WebSocket connections for all chat rooms."""
     
-    def __init__(self):
-        # Dictionary mapping trip_id to set of connections
-        self.active_connections: Dict[str, List[WebSocket]] = {}
-        # Dictionary mapping connection to user info
-        self.connection_users: Dict[WebSocket, dict] = {}
+    def __init__(self, backplane: Backplane):
+        # Dictionary mapping trip_id to its connections
+        self.active_connections: Dict[str, Set[ClientConnection]] = {}
+        # Dictionary mapping socket to its connection
+        self.connections: Dict[WebSocket, ClientConnection] = {}
+        # Shared with other workers; each publishes a room message once
+        self.backplane = backplane
+        self.worker_id = uuid4().hex
+        # Recent message frames per active room, for replay on reconnect
+        self.recent_messages: Dict[str, Deque[Frame]] = {}
+        # Typing state for this worker's connections
+        self.typing = TypingTracker(settings.ws_typing_ttl_seconds)
+        # Who is online per room, across workers
+        self.presence = PresenceTracker(self.worker_id)
+        # Backplane subscriptions in flight, per room
+        self._subscribing: Dict[str, asyncio.Future] = {}
+        self._tasks: List[asyncio.Task] = []
     
-    async def connect(self, websocket: WebSocket, trip_id: str, user_info: dict):
-        """Register a new WebSocket connection."""
-        # Note: websocket.accept() should be called before calling this
+    async def start(self):
+        """Start receiving room broadcasts published by other workers."""
+        await self.backplane.start(self._on_backplane_message)
+        self._tasks = [
+            asyncio.create_task(self._typing_loop()),
+            asyncio.create_task(self._heartbeat_loop()),
+        ]
+    
+    async def stop(self):
+        """Disconnect from the backplane."""
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+        await self.backplane.stop()
+    
+    async def _heartbeat_loop(self):
+        """
+        Ping quiet sockets and reap ones that stopped answering.
+        
+        A single sweep per interval covers every connection, so idle sockets cost
+        no timers or tasks of their own beyond their writer. Only clients known to
+        answer pings are reaped; dead peers that never do are left to the server's
+        protocol-level pings (uvicorn --ws-ping-interval / --ws-ping-timeout).
+        """
+        interval = settings.ws_ping_interval_seconds
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                now = time.monotonic()
+                for conn in list(self.connections.values()):
+                    quiet_for = now - conn.last_seen
+                    if quiet_for > settings.ws_idle_timeout_seconds and conn.answers_pings:
+                        # In the background: a stalled close must not hold up the sweep
+                        asyncio.create_task(self.evict(conn, "idle timeout"))
+                    elif quiet_for >= interval:
+                        self._enqueue(conn, PING_FRAME)
+            except Exception as e:
+                print(f"WS: Heartbeat error: {e}")
+    
+    async def _typing_loop(self):
+        """Send each room at most one coalesced typing update per interval."""
+        interval = settings.ws_typing_interval_ms / 1000
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                for trip_id, update in self.typing.collect(time.monotonic()).items():
+                    frame = Frame(update)
+                    self._deliver_typing(trip_id, frame)
+                    await self._publish(trip_id, frame)
+            except Exception as e:
+                print(f"WS: Typing update error: {e}")
+    
+    async def connect(
+        self,
+        websocket: WebSocket,
+        trip_id: str,
+        user_info: dict,
+        last_seen_id: Optional[str] = None,
+        replay: Optional[List[Frame]] = None,
+        replay_after: Optional[Tuple[datetime, UUID]] = None,
+        binary: bool = False
+    ) -> ClientConnection:
+        """
+        Register a new WebSocket connection.
         
+        With last_seen_id, messages the client missed are queued before it joins the
+        room, so they arrive ahead of (and in order with) live traffic. They come from
+        the room's buffer, plus `replay` (loaded from the DB) when the gap exceeded it;
+        replay_after is the (created_at, id) of the message the DB replay starts after.
+        """
+        # Note: websocket.accept() should be called before calling this
         if trip_id not in self.active_connections:
-            self.active_connections[trip_id] = []
+            # Registered before the await, so a release still queued from the last
+            # member leaving sees the room in use and keeps the subscription
+            self.active_connections[trip_id] = set()
+            self._subscribing[trip_id] = asyncio.ensure_future(self.backplane.subscribe(trip_id))
+            try:
+                await self._subscribing[trip_id]
+            except Exception:
+                # Nobody can have joined yet: others joining wait on the subscription
+                if not self.active_connections.get(trip_id):
+                    self.active_connections.pop(trip_id, None)
+                raise
+            finally:
+                del self._subscribing[trip_id]
+            # Ask workers already in the room who they have online
+            await self._publish(trip_id, Frame({"type": PRESENCE_SYNC}))
+        elif trip_id in self._subscribing:
+            # Another member is joining the room right now; wait until it is subscribed
+            await asyncio.shield(self._subscribing[trip_id])
+        
+        conn = ClientConnection(websocket, trip_id, user_info, binary)
+        conn.writer = asyncio.create_task(self._write_loop(conn))
         
-        self.active_connections[trip_id].append(websocket)
-        self.connection_users[websocket] = user_info
+        if last_seen_id is not None:
+            for frame in self._missed_frames(trip_id, last_seen_id, replay, replay_after):
+                self._enqueue(conn, frame)
         
-        # Notify others that user joined
-        await self.broadcast_to_trip(trip_id, {
-            "type": "user_joined",
+        self.active_connections[trip_id].add(conn)
+        self.connections[websocket] = conn
+        
+        # Extra tabs and devices of an online user change nothing
+        first_local, came_online = self.presence.connect(trip_id, user_info)
+        if first_local:
+            await self._publish_presence(trip_id, True, [user_info])
+        if came_online:
+            self._deliver_local(trip_id, self._presence_frame("user_joined", user_info), exclude=websocket)
+        
+        return conn
+    
+    async def leave(self, websocket: WebSocket, trip_id: str):
+        """Remove a connection and tell the room if its user went offline."""
+        user_info = self.disconnect(websocket, trip_id)
+        if user_info is not None:
+            await self._presence_left(trip_id, user_info)
+    
+    async def _presence_left(self, trip_id: str, user_info: dict):
+        """Uncount a removed connection, announcing user_left only on the user's last one."""
+        last_local, went_offline = self.presence.disconnect(trip_id, user_info["user_id"])
+        if last_local:
+            await self._publish_presence(trip_id, False, [{"user_id": user_info["user_id"]}])
+        if went_offline:
+            self._deliver_local(trip_id, self._presence_frame("user_left", user_info))
+    
+    @staticmethod
+    def _presence_frame(event: str, user_info: dict) -> Frame:
+        return Frame({
+            "type": event,
             "user_id": user_info["user_id"],
-            "user_name": user_info["user_name"],
+            "user_name": user_info.get("user_name"),
             "timestamp": datetime.utcnow().isoformat()
-        }, exclude=websocket)
+        })
+    
+    async def _publish_presence(self, trip_id: str, online: bool, users: List[dict]):
+        """Report this worker's users coming online or going offline in a room."""
+        # In batches, so a busy room's sync answer stays within backplane payload limits
+        for start in range(0, len(users), PRESENCE_BATCH_SIZE):
+            batch = users[start:start + PRESENCE_BATCH_SIZE]
+            await self._publish(trip_id, Frame({"type": PRESENCE, "online": online, "users": batch}))
+    
+    async def _answer_presence_sync(self, trip_id: str):
+        users = self.presence.local_users(trip_id)
+        if users:
+            await self._publish_presence(trip_id, True, users)
+    
+    def _apply_remote_presence(self, trip_id: str, origin: str, event: dict):
+        """Fold another worker's presence report in, and pass real transitions to our sockets."""
+        for user_info in event["users"]:
+            if event["online"]:
+                if self.presence.remote_online(trip_id, origin, user_info):
+                    self._deliver_local(trip_id, self._presence_frame("user_joined", user_info))
+            else:
+                # Resolve the name before the entry is dropped
+                known = next(
+                    (u for u in self.presence.snapshot(trip_id) if u["user_id"] == user_info["user_id"]),
+                    user_info
+                )
+                if self.presence.remote_offline(trip_id, origin, user_info["user_id"]):
+                    self._deliver_local(trip_id, self._presence_frame("user_left", known))
     
     def disconnect(self, websocket: WebSocket, trip_id: str):
-        """Remove a WebSocket connection."""
-        if trip_id in self.active_connections:
-            if websocket in self.active_connections[trip_id]:
-                self.active_connections[trip_id].remove(websocket)
+        """Remove a WebSocket connection. Returns its user info, or None if already removed."""
+        conn = self.connections.pop(websocket, None)
+        if conn is None:
+            return None
+        
+        conn.closed = True
+        if conn.writer and conn.writer is not asyncio.current_task():
+            conn.writer.cancel()
+        self.typing.stop(trip_id, conn.user_info["user_id"])
+        
+        room = self.active_connections.get(trip_id)
+        if room is not None:
+            room.discard(conn)
             
             # Clean up empty rooms
-            if not self.active_connections[trip_id]:
+            if not room:
                 del self.active_connections[trip_id]
+                asyncio.create_task(self._release_room(trip_id))
         
-        user_info = self.connection_users.pop(websocket, None)
-        return user_info
+        return conn.user_info
     
-    async def broadcast_to_trip(self, trip_id: str, message: dict, exclude: WebSocket = None):
-        """Broadcast a message to all connections in a trip."""
+    def _remember(self, trip_id: str, frame: Frame):
+        """Keep a message frame in the room's ring buffer."""
+        if trip_id not in self.active_connections:
+            return
+        if trip_id not in self.recent_messages:
+            self.recent_messages[trip_id] = deque(maxlen=settings.ws_recent_buffer_size)
+        self.recent_messages[trip_id].append(frame)
+    
+    def has_buffered(self, trip_id: str, message_id: str) -> bool:
+        """Whether a message is still in the room's ring buffer."""
+        return any(frame.message["id"] == message_id for frame in self.recent_messages.get(trip_id, ()))
+    
+    def _missed_frames(
+        self,
+        trip_id: str,
+        last_seen_id: str,
+        replay: Optional[List[Frame]],
+        replay_after: Optional[Tuple[datetime, UUID]] = None
+    ) -> List[Frame]:
+        """Frames newer than last_seen_id, from the buffer and any DB replay."""
+        buffered = list(self.recent_messages.get(trip_id, ()))
+        
+        if replay is None:
+            for index, frame in enumerate(buffered):
+                if frame.message["id"] == last_seen_id:
+                    return buffered[index + 1:]
+            return []
+        
+        # The buffer may hold messages not yet flushed to the DB; add those after the replay.
+        # Only ones newer than the anchor: it may be older than the whole buffer (e.g.
+        # sent over REST), and earlier buffered frames were already seen
+        replayed_ids = {frame.message.get("id") for frame in replay}
+        return replay + [
+            frame for frame in buffered
+            if frame.message["id"] not in replayed_ids and (
+                replay_after is None
+                or (datetime.fromisoformat(frame.message["created_at"]), UUID(frame.message["id"])) > replay_after
+            )
+        ]
+    
+    async def _release_room(self, trip_id: str):
+        """Unsubscribe from a room unless someone rejoined it meanwhile."""
         if trip_id not in self.active_connections:
+            self.recent_messages.pop(trip_id, None)
+            # Remote presence is no longer followed once unsubscribed; a later join resyncs
+            self.presence.forget_room(trip_id)
+            try:
+                await self.backplane.unsubscribe(trip_id)
+            except Exception as e:
+                print(f"Backplane: Failed to unsubscribe from trip {trip_id}: {e}")
+    
+    async def _write_loop(self, conn: ClientConnection):
+        """Drain a connection's queue; a send that stalls past the deadline evicts it."""
+        try:
+            while True:
+                frame = await conn.queue.get()
+                # Each encoding is produced once per frame and shared by its recipients
+                send = (
+                    conn.websocket.send_bytes(frame.binary) if conn.binary
+                    else conn.websocket.send_text(frame.text)
+                )
+                await asyncio.wait_for(send, timeout=settings.ws_send_timeout_seconds)
+        except asyncio.CancelledError:
+            raise
+        except asyncio.TimeoutError:
+            await self.evict(conn, "send timeout")
+        except Exception as e:
+            await self.evict(conn, f"send failed: {e}")
+    
+    async def evict(self, conn: ClientConnection, reason: str):
+        """Drop a slow, idle or broken connection and tell the rest of the room it left."""
+        user_info = self.disconnect(conn.websocket, conn.trip_id)
+        if user_info is None:
             return
         
-        for connection in self.active_connections[trip_id]:
-            if connection != exclude:
-                try:
-                    await connection.send_json(message)
-                except Exception:
-                    pass  # Connection might be closed
+        print(f"WS: Evicting {user_info['user_id']} from trip {conn.trip_id}: {reason}")
+        
+        try:
+            # 1013 = try again later; don't let a stalled peer block the close either
+            await asyncio.wait_for(
+                conn.websocket.close(code=1013, reason=reason[:100]),
+                timeout=settings.ws_send_timeout_seconds
+            )
+        except Exception:
+            pass
+        
+        await self._presence_left(conn.trip_id, user_info)
     
-    async def send_personal_message(self, websocket: WebSocket, message: dict):
-        """Send a message to a specific connection."""
-        await websocket.send_json(message)
+    def _enqueue(self, conn: ClientConnection, frame: Frame):
+        """Queue a frame for a connection, evicting it if its queue is full."""
+        if conn.closed:
+            return
+        try:
+            conn.queue.put_nowait(frame)
+        except asyncio.QueueFull:
+            asyncio.create_task(self.evict(conn, "send queue full"))
     
-    def get_online_users(self, trip_id: str) -> List[dict]:
-        """Get list of online users in a trip."""
+    def _deliver_local(self, trip_id: str, frame: Frame, exclude: WebSocket = None):
+        """Enqueue a frame for this worker's connections in a trip."""
         if trip_id not in self.active_connections:
-            return []
+            return
         
-        users = []
-        for conn in self.active_connections[trip_id]:
-            if conn in self.connection_users:
-                users.append(self.connection_users[conn])
+        # Copy: overflowing connections are evicted while we iterate
+        for conn in list(self.active_connections[trip_id]):
+            if conn.websocket != exclude:
+                self._enqueue(conn, frame)
+    
+    def _deliver_typing(self, trip_id: str, frame: Frame):
+        """Enqueue a typing update, leaving each user out of the copy sent to their own connections."""
+        update = frame.message
+        involved = {entry["user_id"] for entry in update["typing"]} | set(update["stopped"])
+        # Per involved user: their filtered frame, or None if nothing is left to tell them
+        own_frames: Dict[str, Optional[Frame]] = {}
+        
+        for conn in list(self.active_connections.get(trip_id, ())):
+            user_id = conn.user_info["user_id"]
+            if user_id not in involved:
+                self._enqueue(conn, frame)
+                continue
+            if user_id not in own_frames:
+                typing = [entry for entry in update["typing"] if entry["user_id"] != user_id]
+                stopped = [other for other in update["stopped"] if other != user_id]
+                own_frames[user_id] = (
+                    Frame({"type": TYPING_UPDATE, "typing": typing, "stopped": stopped})
+                    if typing or stopped else None
+                )
+            if own_frames[user_id] is not None:
+                self._enqueue(conn, own_frames[user_id])
+    
+    def _apply_profile_update(self, trip_id: str, update: dict):
+        """Refresh the cached identity of a user's connections in a trip."""
+        for conn in self.active_connections.get(trip_id, ()):
+            if conn.user_info["user_id"] == update["user_id"]:
+                # In place: the endpoint stamps messages from this same dict
+                conn.user_info.update(
+                    user_name=update["user_name"],
+                    user_avatar=update["user_avatar"]
+                )
+        self.presence.update_user(trip_id, {
+            "user_id": update["user_id"],
+            "user_name": update["user_name"],
+            "user_avatar": update["user_avatar"]
+        })
+    
+    async def broadcast_to_trip(self, trip_id: str, message: dict, exclude: WebSocket = None):
+        """Broadcast a message to all connections in a trip, on every worker. Never waits on sockets."""
+        if message.get("type") == PROFILE_UPDATED:
+            self._apply_profile_update(trip_id, message)
         
-        return users
+        # Encoded at most once, however many sockets and workers receive it
+        frame = Frame(message)
+        if message.get("type") == "message":
+            self._remember(trip_id, frame)
+        self._deliver_local(trip_id, frame, exclude)
+        await self._publish(trip_id, frame)
+    
+    async def _publish(self, trip_id: str, frame: Frame):
+        """Send a frame to the room's other workers."""
+        # "<origin>:<frame>" lets receivers forward the text without re-encoding
+        payload = f"{self.worker_id}:{frame.text}"
+        limit = self.backplane.max_payload_bytes
+        if limit is not None and len(payload.encode("utf-8")) > limit:
+            if not frame.text.startswith(MESSAGE_PREFIX):
+                print(f"Backplane: Frame for trip {trip_id} is too large to publish, delivered locally only")
+                return
+            payload = f"{self.worker_id}:{Frame({'type': MESSAGE_REF, 'id': frame.message['id']}).text}"
+        try:
+            await self.backplane.publish(trip_id, payload)
+        except Exception as e:
+            print(f"Backplane: Failed to publish to trip {trip_id}: {e}")
+    
+    def _on_backplane_message(self, trip_id: str, payload: str):
+        """Fan out a broadcast published by another worker."""
+        origin, _, text = payload.partition(":")
+        # Our own broadcasts were already delivered locally
+        if origin != self.worker_id:
+            frame = Frame.from_text(text)
+            # Cheap prefix check so other frames are never decoded here
+            if text.startswith(PRESENCE_PREFIX):
+                self._apply_remote_presence(trip_id, origin, frame.message)
+                return
+            if text.startswith(PRESENCE_SYNC_PREFIX):
+                asyncio.create_task(self._answer_presence_sync(trip_id))
+                return
+            if text.startswith(TYPING_UPDATE_PREFIX):
+                self._deliver_typing(trip_id, frame)
+                return
+            if text.startswith(MESSAGE_REF_PREFIX):
+                asyncio.create_task(self._deliver_message_ref(trip_id, frame.message["id"]))
+                return
+            if text.startswith(PROFILE_UPDATED_PREFIX):
+                self._apply_profile_update(trip_id, frame.message)
+            elif text.startswith(MESSAGE_PREFIX):
+                self._remember(trip_id, frame)
+            self._deliver_local(trip_id, frame)
+    
+    async def _deliver_message_ref(self, trip_id: str, message_id: str):
+        """Load a message published by reference and deliver it like a remote broadcast."""
+        for _ in range(MESSAGE_REF_ATTEMPTS):
+            try:
+                payload = await asyncio.to_thread(_load_message, message_id)
+            except Exception as e:
+                print(f"Backplane: Failed to load message {message_id}: {e}")
+                return
+            if payload is not None:
+                frame = Frame(payload)
+                self._remember(trip_id, frame)
+                self._deliver_local(trip_id, frame)
+                return
+            await asyncio.sleep(MESSAGE_REF_RETRY_SECONDS)
+        print(f"Backplane: Message {message_id} for trip {trip_id} was never stored, not delivered")
+    
+    async def send_personal_message(self, websocket: WebSocket, message: dict):
+        """Send a message to a specific connection."""
+        conn = self.connections.get(websocket)
+        if conn is not None:
+            self._enqueue(conn, Frame(message))
+    
+    def get_online_users(self, trip_id: str) -> List[dict]:
+        """Get list of online users in a trip, one entry per user."""
+        return self.presence.snapshot(trip_id)
+
+
+def _backplane_url() -> str:
+    """Backplane URL from settings; the postgres backplane defaults to the app database."""
+    if settings.chat_backplane_url:
+        return settings.chat_backplane_url
+    if settings.chat_backplane == "postgres":
+        # libpq wants a plain postgresql:// URL without the SQLAlchemy driver suffix
+        return engine.url.set(drivername="postgresql").render_as_string(hide_password=False)
+    return ""
 
 
 # Global connection manager
-manager = ConnectionManager()
+manager = ConnectionManager(create_backplane(settings.chat_backplane, _backplane_url()))
 
 
 async def authenticate_websocket(websocket: WebSocket) -> dict:
@@ -105,15 +536,13 @@ async def authenticate_websocket(websocket: WebSocket) -> dict:
         db = SessionLocal()
         try:
             user_id = payload.get("sub")
-            user = db.query(User).filter(User.id == user_id).first()
+            user = db.query(User.id, User.display_name, User.email, User.avatar_url).filter(
+                User.id == user_id
+            ).first()
             if not user:
                 return None
             
-            return {
-                "user_id": str(user.id),
-                "user_name": user.display_name or user.email,
-                "user_avatar": user.avatar_url
-            }
+            return _identity(user.id, user.display_name, user.email, user.avatar_url)
         finally:
             db.close()
             
@@ -122,56 +551,150 @@ async def authenticate_websocket(websocket: WebSocket) -> dict:
         return None
 
 
-async def verify_trip_membership(user_id: str, trip_id: str) -> bool:
-    """Verify that a user is a member of a trip."""
-    # print(f"Verifying membership for {user_id} in {trip_id}")
+def _identity(user_id, display_name: Optional[str], email: str, avatar_url: Optional[str]) -> dict:
+    """The identity stamped on a member's outgoing frames."""
+    return {
+        "user_id": str(user_id),
+        "user_name": display_name or email,
+        # Legacy inline avatars would bloat every frame past backplane limits; clients
+        # show their placeholder until backfill_inline_images.py has moved them
+        "user_avatar": None if avatar_url and avatar_url.startswith("data:") else blob_store.thumbnail_url(avatar_url)
+    }
+
+
+def _load_member_identity(user_id: str, trip_id: str) -> Optional[dict]:
+    """Check membership and load the sender identity in a single query."""
     db = SessionLocal()
     try:
-        # Cast UUIDs explicitly if needed, but SQLAlchemy mostly handles it
-        membership = db.query(TripMember).filter(
+        row = db.query(User.id, User.display_name, User.email, User.avatar_url).join(
+            TripMember, TripMember.user_id == User.id
+        ).filter(
             TripMember.trip_id == trip_id,
             TripMember.user_id == user_id
         ).first()
-        return membership is not None
-    except Exception as e:
-        print(f"Membership verification error: {e}")
-        return False
+        if row is None:
+            return None
+        return _identity(row.id, row.display_name, row.email, row.avatar_url)
     finally:
         db.close()
 
 
-async def save_message(trip_id: str, user_id: str, content: str) -> dict:
-    """Save a message to the database."""
+def _load_missed_messages(trip_id: str, last_seen_id: str) -> Optional[Tuple[Tuple[datetime, UUID], List[Frame]]]:
+    """
+    Messages after last_seen_id from the DB, as frames (at most ws_replay_limit, newest kept).
+    
+    Returns ((created_at, id) of last_seen_id, frames), or None when the gap cannot be
+    replayed: the id is unknown or too much was missed.
+    """
+    try:
+        last_seen_uuid = UUID(last_seen_id)
+    except ValueError:
+        return None
+    
     db = SessionLocal()
     try:
-        message = Message(
-            trip_id=trip_id,
-            sender_id=user_id,
-            content=content
-        )
-        db.add(message)
-        db.commit()
-        db.refresh(message)
-        
-        # Get sender info
-        user = db.query(User).filter(User.id == user_id).first()
-        
-        return {
-            "id": str(message.id),
-            "trip_id": str(message.trip_id),
-            "sender_id": str(message.sender_id),
-            "sender_name": user.display_name if user else None,
-            "sender_avatar": user.avatar_url if user else None,
-            "content": message.content,
-            "created_at": message.created_at.isoformat()
-        }
-    except Exception as e:
-        print(f"Save message error: {e}")
-        raise e
+        anchor = db.query(Message.created_at, Message.id).filter(
+            Message.id == last_seen_uuid,
+            Message.trip_id == trip_id
+        ).first()
+        if anchor is None:
+            return None
+        
+        rows = db.query(
+            Message, User.display_name, User.email, User.avatar_url
+        ).join(User, Message.sender_id == User.id).filter(
+            Message.trip_id == trip_id,
+            # id breaks created_at ties, as in the REST history cursors
+            tuple_(Message.created_at, Message.id) > tuple_(anchor.created_at, anchor.id)
+        ).order_by(Message.created_at.desc(), Message.id.desc()).limit(settings.ws_replay_limit + 1).all()
+        
+        if len(rows) > settings.ws_replay_limit:
+            return None
+        
+        frames = [
+            Frame(_stored_message_payload(msg, display_name, email, avatar_url))
+            for msg, display_name, email, avatar_url in reversed(rows)
+        ]
+        return (anchor.created_at, anchor.id), frames
+    finally:
+        db.close()
+
+
+def _load_message(message_id: str) -> Optional[dict]:
+    """One stored message as a broadcast payload, or None if it is not in the DB (yet)."""
+    db = SessionLocal()
+    try:
+        row = db.query(
+            Message, User.display_name, User.email, User.avatar_url
+        ).join(User, Message.sender_id == User.id).filter(Message.id == UUID(message_id)).first()
+        if row is None:
+            return None
+        return _stored_message_payload(*row)
     finally:
         db.close()
 
 
+def _stored_message_payload(msg: Message, display_name: Optional[str], email: str, avatar_url: Optional[str]) -> dict:
+    """Broadcast payload for a message loaded from the DB with its sender's columns."""
+    row = {
+        "id": msg.id,
+        "trip_id": msg.trip_id,
+        "sender_id": msg.sender_id,
+        "content": msg.content,
+        "created_at": msg.created_at
+    }
+    return _message_payload(row, _identity(msg.sender_id, display_name, email, avatar_url))
+
+
+async def notify_profile_changed(db: Session, user: User):
+    """Refresh a user's cached chat identity on every worker and tell their rooms."""
+    trip_ids = [
+        str(row.trip_id) for row in
+        db.query(TripMember.trip_id).filter(TripMember.user_id == user.id).all()
+    ]
+    update = {
+        "type": PROFILE_UPDATED,
+        **_identity(user.id, user.display_name, user.email, user.avatar_url)
+    }
+    for trip_id in trip_ids:
+        await manager.broadcast_to_trip(trip_id, update)
+
+
+def _message_payload(row: dict, user_info: dict) -> dict:
+    """Broadcast payload for a message row, stamped with the sender's identity."""
+    return {
+        "type": "message",
+        "id": str(row["id"]),
+        "trip_id": str(row["trip_id"]),
+        "sender_id": str(row["sender_id"]),
+        "sender_name": user_info["user_name"],
+        "sender_avatar": user_info["user_avatar"],
+        "content": row["content"],
+        "created_at": row["created_at"].isoformat()
+    }
+
+
+def _report_failed_write(websocket: WebSocket, message_id: str):
+    """Done-callback for non-durable writes: tell the sender if the row never made it."""
+    def callback(future: asyncio.Future):
+        if not future.cancelled() and future.exception() is not None:
+            asyncio.create_task(manager.send_personal_message(websocket, {
+                "type": "message_failed",
+                "id": message_id
+            }))
+    return callback
+
+
+async def _receive_frame(websocket: WebSocket) -> dict:
+    """Receive one client frame: JSON text, or MessagePack binary with short field codes."""
+    message = await websocket.receive()
+    if message["type"] == "websocket.disconnect":
+        raise WebSocketDisconnect(message.get("code", 1000))
+    if message.get("bytes") is not None:
+        return decode_client_frame(message["bytes"])
+    return json.loads(message["text"])
+
+
 async def websocket_chat_endpoint(websocket: WebSocket, trip_id: str):
     """WebSocket endpoint for real-time chat."""
     await websocket.accept()
@@ -194,31 +717,40 @@ async def websocket_chat_endpoint(websocket: WebSocket, trip_id: str):
         
         user_id = payload.get("sub")
         
-        # Verify trip membership
-        is_member = await verify_trip_membership(user_id, trip_id)
-        if not is_member:
+        # Verify trip membership and load the sender identity in one round trip.
+        # The identity is reused for the socket's lifetime (refreshed on profile_updated).
+        user_info = await asyncio.to_thread(_load_member_identity, user_id, trip_id)
+        if user_info is None:
             print(f"WS Error: User {user_id} is not member of trip {trip_id}")
             await websocket.close(code=4003, reason="Not a member of this trip")
             return
         
-        # Get user info
-        db = SessionLocal()
-        try:
-            user = db.query(User).filter(User.id == user_id).first()
-            if not user:
-                await websocket.close(code=4001, reason="User not found")
-                return
-                
-            user_info = {
-                "user_id": str(user.id),
-                "user_name": user.display_name or user.email,
-                "user_avatar": user.avatar_url
-            }
-        finally:
-            db.close()
+        # Resume: replay from the room buffer, or from the DB if the gap exceeds it
+        last_seen_id = websocket.query_params.get("last_seen_id")
+        replay = None
+        replay_after = None
+        if last_seen_id and not manager.has_buffered(trip_id, last_seen_id):
+            missed = await asyncio.to_thread(_load_missed_messages, trip_id, last_seen_id)
+            if missed is None:
+                # Too far behind: tell the client to reload history over REST
+                replay = [Frame({"type": "history_gap"})]
+            else:
+                replay_after, replay = missed
+        
+        # Frame encoding: JSON text by default, or compact MessagePack binary
+        encoding = websocket.query_params.get("encoding", ENCODING_JSON)
+        if encoding not in (ENCODING_JSON, ENCODING_MSGPACK):
+            await websocket.close(code=4400, reason="Unsupported encoding")
+            return
         
         # Connect
-        await manager.connect(websocket, trip_id, user_info)
+        conn = await manager.connect(
+            websocket, trip_id, user_info,
+            last_seen_id=last_seen_id,
+            replay=replay,
+            replay_after=replay_after,
+            binary=encoding == ENCODING_MSGPACK
+        )
         
         # Send current online users
         online_users = manager.get_online_users(trip_id)
@@ -228,46 +760,68 @@ async def websocket_chat_endpoint(websocket: WebSocket, trip_id: str):
         })
         
         try:
-            while True:
+            while not conn.closed:
                 # Receive message
-                data = await websocket.receive_json()
+                data = await _receive_frame(websocket)
+                conn.last_seen = time.monotonic()
                 msg_type = data.get("type", "message")
                 
-                if msg_type == "message":
+                if msg_type == "pong":
+                    # Heartbeat reply; receiving it already refreshed last_seen
+                    conn.answers_pings = True
+                    continue
+                
+                elif msg_type == "ping":
+                    await manager.send_personal_message(websocket, {"type": "pong"})
+                
+                elif msg_type == "message":
                     content = data.get("content", "").strip()
-                    if content:
-                        # Save to database
-                        saved_msg = await save_message(trip_id, user_id, content)
-                        
-                        # Broadcast to all in room
-                        await manager.broadcast_to_trip(trip_id, {
-                            "type": "message",
-                            **saved_msg
+                    # Measured as encoded JSON, so the broadcast frame fits every backplane
+                    if content and len(orjson.dumps(content)) > settings.chat_max_message_bytes:
+                        await manager.send_personal_message(websocket, {
+                            "type": "message_failed",
+                            "detail": f"Message is longer than {settings.chat_max_message_bytes} bytes"
                         })
+                    elif content:
+                        # Queue for the next batched insert
+                        row = message_writer.new_message(trip_id, user_id, content)
+                        payload = _message_payload(row, user_info)
+                        written = message_writer.write(row)
+                        
+                        if settings.chat_durable_ack:
+                            try:
+                                await written
+                            except Exception:
+                                await manager.send_personal_message(websocket, {
+                                    "type": "message_failed",
+                                    "id": payload["id"]
+                                })
+                                continue
+                        else:
+                            written.add_done_callback(_report_failed_write(websocket, payload["id"]))
+                        
+                        # Broadcast to all in room; sending ends the typing burst
+                        manager.typing.stop(trip_id, user_info["user_id"])
+                        await manager.broadcast_to_trip(trip_id, payload)
                 
                 elif msg_type == "typing":
-                    # Broadcast typing indicator
-                    await manager.broadcast_to_trip(trip_id, {
-                        "type": "typing",
-                        "user_id": user_info["user_id"],
-                        "user_name": user_info["user_name"]
-                    }, exclude=websocket)
+                    # Coalesced into the room's next typing_update
+                    manager.typing.start(trip_id, user_info["user_id"], user_info["user_name"], time.monotonic())
                 
                 elif msg_type == "stop_typing":
-                    await manager.broadcast_to_trip(trip_id, {
-                        "type": "stop_typing",
-                        "user_id": user_info["user_id"]
-                    }, exclude=websocket)
+                    manager.typing.stop(trip_id, user_info["user_id"])
+                
+                elif msg_type == "read":
+                    # Debounced; the pointer is written with the next batch
+                    message_id = data.get("message_id")
+                    if message_id:
+                        read_marker.mark(trip_id, user_id, message_id)
         
         except WebSocketDisconnect:
-            user_info = manager.disconnect(websocket, trip_id)
-            if user_info:
-                await manager.broadcast_to_trip(trip_id, {
-                    "type": "user_left",
-                    "user_id": user_info["user_id"],
-                    "user_name": user_info["user_name"],
-                    "timestamp": datetime.utcnow().isoformat()
-                })
+            pass
+        finally:
+            # No-op if the connection was already evicted as a slow consumer
+            await manager.leave(websocket, trip_id)
                 
     except Exception as e:
         print(f"WebSocket unhandled error: {e}")
@@ -0,0 +1,84 @@
+from typing import Any, Optional
+import msgpack
+import orjson
+
+# Client-selectable frame encodings (?encoding=...)
+ENCODING_JSON = "json"
+ENCODING_MSGPACK = "msgpack"
+
+# Short field codes used by the compact binary encoding
+FIELD_CODES = {
+    "type": "t",
+    "id": "i",
+    "trip_id": "r",
+    "sender_id": "s",
+    "sender_name": "n",
+    "sender_avatar": "a",
+    "content": "c",
+    "created_at": "d",
+    "user_id": "u",
+    "user_name": "un",
+    "user_avatar": "ua",
+    "users": "us",
+    "timestamp": "ts",
+    "typing": "ty",
+    "stopped": "st",
+    "last_seen_id": "l",
+    "message_id": "m",
+}
+FIELD_NAMES = {code: name for name, code in FIELD_CODES.items()}
+
+
+def _recode(value: Any, table: dict) -> Any:
+    """Rename dict keys through a code table, recursing into lists and dicts."""
+    if isinstance(value, dict):
+        return {table.get(key, key): _recode(item, table) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_recode(item, table) for item in value]
+    return value
+
+
+def decode_client_frame(data: bytes) -> dict:
+    """Decode a binary (MessagePack, short-coded) frame sent by a client."""
+    return _recode(msgpack.unpackb(data, raw=False), FIELD_NAMES)
+
+
+class Frame:
+    """
+    An outgoing chat frame, encoded once and shared by every recipient.
+
+    Frames built from a dict encode lazily on first use, once per encoding;
+    frames received from the backplane already carry their JSON text and are
+    only decoded if needed.
+    """
+    
+    __slots__ = ("_message", "_text", "_binary")
+    
+    def __init__(self, message: Optional[dict] = None, text: Optional[str] = None):
+        self._message = message
+        self._text = text
+        self._binary: Optional[bytes] = None
+    
+    @classmethod
+    def from_text(cls, text: str) -> "Frame":
+        return cls(text=text)
+    
+    @property
+    def message(self) -> dict:
+        if self._message is None:
+            self._message = orjson.loads(self._text)
+        return self._message
+    
+    @property
+    def text(self) -> str:
+        """JSON text frame (the default encoding)."""
+        if self._text is None:
+            self._text = orjson.dumps(self._message).decode("utf-8")
+        return self._text
+    
+    @property
+    def binary(self) -> bytes:
+        """Compact binary frame: MessagePack with short field codes."""
+        if self._binary is None:
+            self._binary = msgpack.packb(_recode(self.message, FIELD_CODES), use_bin_type=True)
+        return self._binary
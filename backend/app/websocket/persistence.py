@@ -0,0 +1,158 @@
+import asyncio
+from datetime import datetime
+from typing import List, Optional, Tuple
+from uuid import UUID, uuid4
+from sqlalchemy import insert
+from app.config import get_settings
+from app.database import SessionLocal
+from app.models.message import Message
+from app.utils.room_summary import record_messages
+
+settings = get_settings()
+
+
+class MessageWriter:
+    """
+    Write-behind persister for chat messages.
+
+    Messages get their id and timestamp here, so they can be broadcast before
+    they are stored. Pending rows are flushed as one multi-row INSERT every
+    chat_flush_interval_ms, or as soon as chat_flush_batch_size rows are waiting.
+    """
+
+    def __init__(self, batch_size: int, flush_interval_ms: int):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000
+        self._pending: List[Tuple[dict, asyncio.Future]] = []
+        self._has_pending = asyncio.Event()
+        self._batch_full = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        # Set once stop() has drained; nothing would flush a later write
+        self._stopped = False
+
+    async def start(self):
+        """Start the background flush loop."""
+        # Events bind to the running loop, so create them here rather than at import
+        self._has_pending = asyncio.Event()
+        self._batch_full = asyncio.Event()
+        self._stopping = False
+        self._stopped = False
+        self._task = asyncio.create_task(self._flush_loop())
+
+    async def stop(self):
+        """Stop the flush loop and drain everything still pending."""
+        if self._task is not None:
+            # Wake the loop and let it exit after its current batch; cancelling
+            # mid-insert would leave that batch's futures unresolved
+            self._stopping = True
+            self._has_pending.set()
+            self._batch_full.set()
+            await self._task
+            self._task = None
+        while self._pending:
+            await self.flush()
+        self._stopped = True
+
+    def new_message(self, trip_id: str, sender_id: str, content: str) -> dict:
+        """Build a message row with an application-generated id and timestamp."""
+        return {
+            "id": uuid4(),
+            "trip_id": UUID(str(trip_id)),
+            "sender_id": UUID(str(sender_id)),
+            "content": content,
+            "created_at": datetime.utcnow()
+        }
+
+    def write(self, row: dict) -> asyncio.Future:
+        """
+        Queue a row. The returned future resolves once the row is committed.
+
+        After stop() the future fails immediately, since no flush would ever resolve it.
+        """
+        future = asyncio.get_running_loop().create_future()
+        if self._stopped:
+            future.set_exception(RuntimeError("Message writer is stopped"))
+            return future
+        self._pending.append((row, future))
+        self._has_pending.set()
+        if len(self._pending) >= self.batch_size:
+            self._batch_full.set()
+        return future
+
+    async def _flush_loop(self):
+        while not self._stopping:
+            await self._has_pending.wait()
+            # Give the batch a few milliseconds to fill up
+            try:
+                await asyncio.wait_for(self._batch_full.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            await self.flush()
+
+    async def flush(self):
+        """Insert up to one batch of pending rows."""
+        batch = self._pending[:self.batch_size]
+        self._pending = self._pending[self.batch_size:]
+        if not self._pending:
+            self._has_pending.clear()
+        if len(self._pending) < self.batch_size:
+            self._batch_full.clear()
+        if not batch:
+            return
+
+        try:
+            errors = await self._write([row for row, _ in batch])
+        except asyncio.CancelledError:
+            # Never leave a sender waiting forever on a batch we stopped tracking
+            for _, future in batch:
+                future.cancel()
+            raise
+
+        for (row, future), error in zip(batch, errors):
+            if future.done():
+                continue
+            if error is None:
+                future.set_result(None)
+            else:
+                print(f"Message flush error ({row['id']}): {error}")
+                future.set_exception(error)
+
+    async def _write(self, rows: List[dict]) -> List[Optional[Exception]]:
+        """Insert rows as one batch. Returns each row's error, or None."""
+        try:
+            await asyncio.to_thread(self._insert, rows)
+            return [None] * len(rows)
+        except Exception as e:
+            if len(rows) == 1:
+                return [e]
+            # One bad row fails the whole INSERT; retry row by row so only it fails
+            print(f"Message flush error ({len(rows)} messages), retrying one by one: {e}")
+            return await asyncio.to_thread(self._insert_each, rows)
+
+    @staticmethod
+    def _insert(rows: List[dict]):
+        db = SessionLocal()
+        try:
+            # executemany on the Core insert renders multi-row VALUES batches
+            db.execute(insert(Message), rows)
+            record_messages(db, rows)
+            db.commit()
+        finally:
+            db.close()
+
+    @classmethod
+    def _insert_each(cls, rows: List[dict]) -> List[Optional[Exception]]:
+        """Insert rows in separate transactions. Returns each row's error, or None."""
+        errors = []
+        for row in rows:
+            try:
+                cls._insert([row])
+                errors.append(None)
+            except Exception as e:
+                errors.append(e)
+        return errors
+
+
+# Global message writer
+message_writer = MessageWriter(settings.chat_flush_batch_size, settings.chat_flush_interval_ms)
@@ -0,0 +1,109 @@
+from typing import Dict, List, Set, Tuple
+
+
+class PresenceTracker:
+    """
+    Who is online in each room, reference-counted per user.
+
+    A user is online while any of their connections is open, on this worker
+    or another. Local connections are counted here; other workers report
+    their users through presence events on the backplane. Methods return
+    whether a call changed a user's online state, so only real transitions
+    are sent to clients, and the snapshot is kept ready rather than
+    rebuilt from the connection list on every join.
+    """
+
+    def __init__(self, worker_id: str):
+        self.worker_id = worker_id
+        # trip_id -> user_id -> number of this worker's connections
+        self.local_counts: Dict[str, Dict[str, int]] = {}
+        # trip_id -> user_id -> workers the user is connected through
+        self.workers: Dict[str, Dict[str, Set[str]]] = {}
+        # trip_id -> user_id -> user info, i.e. the online-users snapshot
+        self.online: Dict[str, Dict[str, dict]] = {}
+
+    def _add(self, trip_id: str, worker_id: str, user_info: dict) -> bool:
+        user_id = user_info["user_id"]
+        workers = self.workers.setdefault(trip_id, {}).setdefault(user_id, set())
+        came_online = not workers
+        workers.add(worker_id)
+        self.online.setdefault(trip_id, {})[user_id] = user_info
+        return came_online
+
+    def _remove(self, trip_id: str, worker_id: str, user_id: str) -> bool:
+        room = self.workers.get(trip_id)
+        if not room or user_id not in room:
+            return False
+
+        room[user_id].discard(worker_id)
+        if room[user_id]:
+            return False
+
+        del room[user_id]
+        del self.online[trip_id][user_id]
+        if not room:
+            del self.workers[trip_id]
+            del self.online[trip_id]
+        return True
+
+    def connect(self, trip_id: str, user_info: dict) -> Tuple[bool, bool]:
+        """
+        Count a local connection.
+
+        Returns (first_local, came_online): whether this is the user's first
+        connection on this worker, and whether they were offline everywhere.
+        """
+        counts = self.local_counts.setdefault(trip_id, {})
+        user_id = user_info["user_id"]
+        counts[user_id] = counts.get(user_id, 0) + 1
+        if counts[user_id] > 1:
+            return False, False
+        return True, self._add(trip_id, self.worker_id, user_info)
+
+    def disconnect(self, trip_id: str, user_id: str) -> Tuple[bool, bool]:
+        """
+        Uncount a local connection.
+
+        Returns (last_local, went_offline), the mirror image of connect.
+        """
+        counts = self.local_counts.get(trip_id)
+        if not counts or user_id not in counts:
+            return False, False
+
+        counts[user_id] -= 1
+        if counts[user_id] > 0:
+            return False, False
+
+        del counts[user_id]
+        if not counts:
+            del self.local_counts[trip_id]
+        return True, self._remove(trip_id, self.worker_id, user_id)
+
+    def remote_online(self, trip_id: str, worker_id: str, user_info: dict) -> bool:
+        """Apply another worker's report that a user connected. Returns came_online."""
+        return self._add(trip_id, worker_id, user_info)
+
+    def remote_offline(self, trip_id: str, worker_id: str, user_id: str) -> bool:
+        """Apply another worker's report that a user left. Returns went_offline."""
+        return self._remove(trip_id, worker_id, user_id)
+
+    def update_user(self, trip_id: str, user_info: dict):
+        """Refresh a user's snapshot entry after a profile change."""
+        room = self.online.get(trip_id)
+        if room and user_info["user_id"] in room:
+            room[user_info["user_id"]] = user_info
+
+    def snapshot(self, trip_id: str) -> List[dict]:
+        """Online users in a room."""
+        return list(self.online.get(trip_id, {}).values())
+
+    def local_users(self, trip_id: str) -> List[dict]:
+        """Users with a connection on this worker, for answering sync requests."""
+        room = self.online.get(trip_id, {})
+        return [room[user_id] for user_id in self.local_counts.get(trip_id, {}) if user_id in room]
+
+    def forget_room(self, trip_id: str):
+        """Drop remote state for a room this worker no longer follows."""
+        if trip_id not in self.local_counts:
+            self.workers.pop(trip_id, None)
+            self.online.pop(trip_id, None)
@@ -0,0 +1,95 @@
+import asyncio
+from typing import Dict, Optional, Tuple
+from uuid import UUID
+from sqlalchemy import bindparam, or_, select, update
+from app.config import get_settings
+from app.database import SessionLocal
+from app.models.message import Message
+from app.models.trip_member import TripMember
+
+settings = get_settings()
+
+
+class ReadMarker:
+    """
+    Debounced read pointers.
+
+    "read" frames only record the newest message id per member here. Every
+    ws_read_flush_interval_ms the pending pointers are written in one batch,
+    so a client acknowledging each incoming message costs at most one UPDATE
+    per member per interval.
+    """
+
+    def __init__(self, flush_interval_ms: int):
+        self.flush_interval = flush_interval_ms / 1000
+        # (trip_id, user_id) -> last message id read
+        self._pending: Dict[Tuple[str, str], str] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        """Start the background flush loop."""
+        self._task = asyncio.create_task(self._flush_loop())
+
+    async def stop(self):
+        """Stop the flush loop and write what is still pending."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    def mark(self, trip_id: str, user_id: str, message_id: str):
+        """Record that a member has read up to a message."""
+        try:
+            UUID(str(message_id))
+        except ValueError:
+            return
+        self._pending[(trip_id, user_id)] = message_id
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    async def flush(self):
+        """Write all pending read pointers."""
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, {}
+        try:
+            await asyncio.to_thread(self._update, pending)
+        except Exception as e:
+            print(f"Read pointer flush error ({len(pending)} members): {e}")
+
+    @staticmethod
+    def _update(pending: Dict[Tuple[str, str], str]):
+        # The message's own timestamp becomes the pointer; unknown ids and
+        # pointers older than the stored one are ignored
+        read_at = select(Message.created_at).where(
+            Message.id == bindparam("b_message_id"),
+            Message.trip_id == bindparam("b_trip_id")
+        ).scalar_subquery()
+        members = TripMember.__table__
+        statement = update(members).where(
+            members.c.trip_id == bindparam("b_trip_id"),
+            members.c.user_id == bindparam("b_user_id"),
+            read_at.isnot(None),
+            or_(members.c.last_read_at.is_(None), members.c.last_read_at < read_at)
+        ).values(last_read_message_id=bindparam("b_message_id"), last_read_at=read_at)
+
+        db = SessionLocal()
+        try:
+            db.execute(statement, [
+                {"b_trip_id": UUID(str(trip_id)), "b_user_id": UUID(str(user_id)), "b_message_id": UUID(str(message_id))}
+                for (trip_id, user_id), message_id in pending.items()
+            ])
+            db.commit()
+        finally:
+            db.close()
+
+
+# Global read marker
+read_marker = ReadMarker(settings.ws_read_flush_interval_ms)
@@ -0,0 +1,77 @@
+from typing import Dict, List, Set, Tuple
+
+
+class TypingTracker:
+    """
+    Per-room typing state, reported as coalesced changes.
+
+    Keystroke frames only update state here. The connection manager collects
+    the changes once per interval and sends each room at most one
+    "typing_update" listing who started and who stopped typing. Typers that
+    go quiet for longer than the TTL are expired automatically.
+    """
+    
+    def __init__(self, ttl_seconds: float):
+        self.ttl = ttl_seconds
+        # trip_id -> user_id -> (user_name, expires_at)
+        self.rooms: Dict[str, Dict[str, Tuple[str, float]]] = {}
+        # trip_id -> (started user_id -> user_name, stopped user_ids) since the last collect
+        self.changes: Dict[str, Tuple[Dict[str, str], Set[str]]] = {}
+    
+    def _room_changes(self, trip_id: str) -> Tuple[Dict[str, str], Set[str]]:
+        if trip_id not in self.changes:
+            self.changes[trip_id] = ({}, set())
+        return self.changes[trip_id]
+    
+    def start(self, trip_id: str, user_id: str, user_name: str, now: float):
+        """Record a typing frame; only the first one of a burst counts as a change."""
+        room = self.rooms.setdefault(trip_id, {})
+        is_new = user_id not in room
+        room[user_id] = (user_name, now + self.ttl)
+        
+        if is_new:
+            started, stopped = self._room_changes(trip_id)
+            started[user_id] = user_name
+            stopped.discard(user_id)
+    
+    def stop(self, trip_id: str, user_id: str):
+        """Record that a user stopped typing (explicitly, by sending, or by leaving)."""
+        room = self.rooms.get(trip_id)
+        if not room or user_id not in room:
+            return
+        
+        del room[user_id]
+        if not room:
+            del self.rooms[trip_id]
+        
+        started, stopped = self._room_changes(trip_id)
+        if user_id in started:
+            # Started and stopped within one interval: nothing to report
+            del started[user_id]
+        else:
+            stopped.add(user_id)
+    
+    def collect(self, now: float) -> Dict[str, dict]:
+        """Expire stale typers and return one update frame per changed room."""
+        expired: List[Tuple[str, str]] = [
+            (trip_id, user_id)
+            for trip_id, room in self.rooms.items()
+            for user_id, (_, expires_at) in room.items()
+            if expires_at <= now
+        ]
+        for trip_id, user_id in expired:
+            self.stop(trip_id, user_id)
+        
+        updates = {}
+        for trip_id, (started, stopped) in self.changes.items():
+            if started or stopped:
+                updates[trip_id] = {
+                    "type": "typing_update",
+                    "typing": [
+                        {"user_id": user_id, "user_name": user_name}
+                        for user_id, user_name in started.items()
+                    ],
+                    "stopped": list(stopped)
+                }
+        self.changes = {}
+        return updates
@@ -0,0 +1,193 @@
+"""
+Move inline base64 images out of the database.
+
+Older uploads were returned as "data:" URIs and saved as-is in trips.image_url
+and users.avatar_url. This job walks those columns in primary-key order, a
+batch at a time, stores each decoded image in the blob store (the same place
+/api/upload writes) and replaces the column with the blob's URL. Each batch
+commits on its own, so the app keeps running throughout.
+
+Progress is checkpointed to --state after every batch; rerunning resumes after
+the last processed row. Rows that fail to decode are left untouched and
+reported.
+
+Example:
+    python backfill_inline_images.py --batch 50 --sleep 0.2
+    python backfill_inline_images.py --dry-run
+"""
+import sys
+sys.path.insert(0, '.')
+
+import argparse
+import asyncio
+import base64
+import binascii
+import json
+import os
+import time
+from typing import Dict, Optional, Tuple
+from urllib.parse import unquote_to_bytes
+
+from sqlalchemy import update
+
+from app.database import SessionLocal
+from app.models.trip import Trip
+from app.models.user import User
+from app.storage import blob_store
+from app.storage.images import shutdown_pool
+
+# Columns that may hold data URIs: name -> (model, column)
+COLUMNS = {
+    "trips.image_url": (Trip, Trip.image_url),
+    "users.avatar_url": (User, User.avatar_url),
+}
+DEFAULT_STATE = "backfill_inline_images.json"
+
+
+def parse_data_uri(value: str) -> Tuple[str, bytes]:
+    """Split a data URI into (content type, decoded bytes). Raises ValueError if malformed."""
+    header, comma, payload = value.partition(",")
+    if not comma or not header.startswith("data:"):
+        raise ValueError("not a data URI")
+    params = header[len("data:"):].split(";")
+    content_type = params[0] or "text/plain"
+    if "base64" in params[1:]:
+        try:
+            return content_type, base64.b64decode(payload, validate=True)
+        except binascii.Error as e:
+            raise ValueError(f"bad base64: {e}")
+    return content_type, unquote_to_bytes(payload)
+
+
+class Counters:
+    def __init__(self):
+        self.scanned = 0
+        self.converted = 0
+        self.failed = 0
+        # Changed by someone else between our read and write
+        self.skipped = 0
+        self.bytes_before = 0
+        self.bytes_after = 0
+
+    @property
+    def reclaimed(self) -> int:
+        return self.bytes_before - self.bytes_after
+
+    def line(self) -> str:
+        return (f"{self.scanned} scanned, {self.converted} converted, {self.failed} failed, "
+                f"{self.skipped} skipped, {self.reclaimed / 1024 / 1024:.1f} MB reclaimed")
+
+
+def load_state(path: str) -> Dict[str, str]:
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_state(path: str, state: Dict[str, str]):
+    # Write then rename, so an interrupted run never leaves a truncated checkpoint
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w") as f:
+        json.dump(state, f, indent=2)
+    os.replace(temp_path, path)
+
+
+async def convert(value: str, dry_run: bool) -> Optional[str]:
+    """Store one data URI and return its URL (None on a dry run)."""
+    content_type, data = parse_data_uri(value)
+    if dry_run:
+        return None
+    blob = await blob_store.save_bytes(data, content_type)
+    return blob.url
+
+
+async def backfill_column(name: str, args, state: Dict[str, str]) -> Counters:
+    """Convert one column, batch by batch, from the checkpointed id onwards."""
+    model, column = COLUMNS[name]
+    table = model.__table__
+    counters = Counters()
+    last_id = state.get(name)
+
+    while True:
+        db = SessionLocal()
+        try:
+            query = db.query(model.id, column).filter(column.like("data:%"))
+            if last_id is not None:
+                query = query.filter(model.id > model.id.type.python_type(last_id))
+            rows = query.order_by(model.id).limit(args.batch).all()
+            if not rows:
+                break
+
+            for row_id, value in rows:
+                counters.scanned += 1
+                try:
+                    url = await convert(value, args.dry_run)
+                except ValueError as e:
+                    counters.failed += 1
+                    print(f"  {name} {row_id}: {e}")
+                    continue
+
+                counters.bytes_before += len(value)
+                if args.dry_run:
+                    counters.converted += 1
+                    continue
+                # Only replace the value we read; a concurrent edit wins
+                result = db.execute(
+                    update(table).where(table.c.id == row_id, table.c[column.key] == value).values(
+                        {column.key: url}
+                    )
+                )
+                if result.rowcount:
+                    counters.converted += 1
+                    counters.bytes_after += len(url)
+                else:
+                    counters.skipped += 1
+                    counters.bytes_before -= len(value)
+            db.commit()
+        finally:
+            db.close()
+
+        last_id = str(rows[-1][0])
+        if not args.dry_run:
+            state[name] = last_id
+            save_state(args.state, state)
+        print(f"[{name}] {counters.line()}")
+        if args.sleep:
+            await asyncio.sleep(args.sleep)
+
+    return counters
+
+
+async def main(args):
+    state = {} if args.restart else load_state(args.state)
+    started = time.monotonic()
+    totals = {}
+    for name in args.columns:
+        if name in state:
+            print(f"[{name}] resuming after id {state[name]}")
+        totals[name] = await backfill_column(name, args, state)
+
+    print(f"Done in {time.monotonic() - started:.1f}s{' (dry run)' if args.dry_run else ''}")
+    for name, counters in totals.items():
+        print(f"  {name}: {counters.line()}")
+    # Postgres keeps the freed pages until the table is vacuumed
+    print("Run VACUUM (or VACUUM FULL) on trips and users to return the space to the OS.")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Move inline data: URI images into blob storage")
+    parser.add_argument("--columns", nargs="+", choices=list(COLUMNS), default=list(COLUMNS))
+    parser.add_argument("--batch", type=int, default=50, help="Rows per batch (each holds a whole image in memory)")
+    parser.add_argument("--sleep", type=float, default=0, help="Seconds to pause between batches")
+    parser.add_argument("--state", default=DEFAULT_STATE, help="Checkpoint file")
+    parser.add_argument("--restart", action="store_true", help="Ignore the checkpoint and scan from the start")
+    parser.add_argument("--dry-run", action="store_true", help="Decode and measure without writing anything")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main(parse_args()))
+    finally:
+        shutdown_pool()
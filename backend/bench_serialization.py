@@ -0,0 +1,240 @@
+"""
+Benchmark API response serialization.
+
+Serves the same payloads two ways from in-process FastAPI apps and reports CPU
+time per response:
+
+  before  stdlib JSONResponse on every route: response models are dumped to a
+          dict, re-encoded by jsonable_encoder and json.dumps; plain dicts go
+          through jsonable_encoder too
+  after   the app's setup: response models are dumped straight to JSON bytes by
+          Pydantic, UserProfile is validated from the ORM row, and plain-dict
+          list endpoints return FastJSONResponse (orjson, no jsonable_encoder)
+
+Requests are driven through the ASGI interface directly, so no sockets or HTTP
+client are involved. Both variants must produce identical JSON.
+
+Example:
+    python bench_serialization.py --items 100 --iterations 2000
+"""
+import sys
+sys.path.insert(0, '.')
+
+import argparse
+import asyncio
+import json
+import time
+import uuid
+from datetime import datetime
+from typing import Dict, List
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+
+from app.models.user import User
+from app.schemas.trip import TripList
+from app.schemas.user import UserProfile
+from app.utils.responses import DEFAULT_RESPONSE_CLASS, FastJSONResponse
+
+THUMB_URL = "http://localhost:8000/static/blobs/ab/" + "ab" * 32 + "_thumb.webp"
+
+
+def make_rows(items: int) -> List[dict]:
+    """Trip list rows shaped like the projected list queries."""
+    return [
+        {
+            "id": uuid.uuid4(),
+            "title": f"Trip {i}",
+            "location": "Lisbon, Portugal",
+            "duration": "5 days",
+            "dates": "Jun 12 - Jun 17",
+            "image_url": THUMB_URL,
+            "tags": ["hiking", "beach", "food"],
+            "max_members": 8,
+            "created_at": datetime(2026, 6, 1, 12, 0, i % 60),
+        }
+        for i in range(items)
+    ]
+
+
+def make_user() -> User:
+    return User(
+        id=uuid.uuid4(),
+        email="bench@example.com",
+        display_name="Bench",
+        avatar_url=THUMB_URL,
+        location="Lisbon",
+        bio="Likes long walks",
+        age_range="25-34",
+        personality="Explorer",
+        interests=["hiking", "food"],
+        onboarding_completed=True,
+        created_at=datetime(2026, 1, 1),
+    )
+
+
+def trip_cards(rows: List[dict]) -> List[TripList]:
+    return [
+        TripList(
+            id=row["id"],
+            title=row["title"],
+            location=row["location"],
+            duration=row["duration"],
+            image_url=row["image_url"],
+            tags=row["tags"] or [],
+            member_count=3,
+            max_members=row["max_members"],
+            is_member=False
+        )
+        for row in rows
+    ]
+
+
+def inbox(rows: List[dict]) -> List[dict]:
+    """Plain-dict list like the groups inbox."""
+    return [
+        {
+            "id": str(row["id"]),
+            "title": row["title"],
+            "location": row["location"],
+            "members": "3 Members",
+            "lastMessage": "U1: see you there...",
+            "time": row["created_at"].strftime("%I:%M %p"),
+            "unread": 2,
+            "image": row["image_url"]
+        }
+        for row in rows
+    ]
+
+
+def build_before(rows: List[dict], user: User) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/trips", response_model=List[TripList], response_class=JSONResponse)
+    async def trips():
+        return trip_cards(rows)
+
+    @app.get("/profile", response_model=UserProfile, response_class=JSONResponse)
+    async def profile():
+        return UserProfile(
+            id=user.id,
+            email=user.email,
+            display_name=user.display_name,
+            avatar_url=user.avatar_url,
+            location=user.location,
+            bio=user.bio,
+            age_range=user.age_range,
+            personality=user.personality,
+            interests=user.interests or [],
+            onboarding_completed=user.onboarding_completed,
+            created_at=user.created_at
+        )
+
+    @app.get("/inbox", response_class=JSONResponse)
+    async def groups():
+        return inbox(rows)
+
+    return app
+
+
+def build_after(rows: List[dict], user: User) -> FastAPI:
+    app = FastAPI(default_response_class=DEFAULT_RESPONSE_CLASS)
+
+    @app.get("/trips", response_model=List[TripList])
+    async def trips():
+        return trip_cards(rows)
+
+    @app.get("/profile", response_model=UserProfile)
+    async def profile():
+        return UserProfile.model_validate(user)
+
+    @app.get("/inbox")
+    async def groups():
+        return FastJSONResponse(inbox(rows))
+
+    return app
+
+
+async def request(app: FastAPI, path: str) -> bytes:
+    """One GET through the ASGI interface; returns the response body."""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0", "spec_version": "2.4"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [],
+        "server": ("bench", 80),
+        "client": ("bench", 1),
+    }
+    body = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.body":
+            body.append(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return b"".join(body)
+
+
+async def measure(app: FastAPI, path: str, iterations: int) -> float:
+    """Mean CPU microseconds per response."""
+    for _ in range(min(100, iterations)):
+        await request(app, path)
+    started = time.process_time()
+    for _ in range(iterations):
+        await request(app, path)
+    return (time.process_time() - started) / iterations * 1e6
+
+
+async def main(args) -> Dict[str, dict]:
+    rows = make_rows(args.items)
+    user = make_user()
+    before = build_before(rows, user)
+    after = build_after(rows, user)
+
+    results = {}
+    for path in ("/trips", "/profile", "/inbox"):
+        expected = json.loads(await request(before, path))
+        if json.loads(await request(after, path)) != expected:
+            raise SystemExit(f"{path}: responses differ between variants")
+
+        before_us = await measure(before, path, args.iterations)
+        after_us = await measure(after, path, args.iterations)
+        results[path] = {
+            "before_us": round(before_us, 1),
+            "after_us": round(after_us, 1),
+            "speedup": round(before_us / after_us, 2),
+        }
+    return results
+
+
+def print_report(results: Dict[str, dict], args):
+    print(f"{args.items} items per list, {args.iterations} requests per variant (CPU us per response)")
+    print(f"{'endpoint':<10} {'before':>10} {'after':>10} {'speedup':>8}")
+    for path, result in results.items():
+        print(f"{path:<10} {result['before_us']:>10.1f} {result['after_us']:>10.1f} {result['speedup']:>7.2f}x")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="API response serialization benchmark")
+    parser.add_argument("--items", type=int, default=100, help="Items per list response")
+    parser.add_argument("--iterations", type=int, default=2000, help="Requests per endpoint and variant")
+    parser.add_argument("--json", help="Also write the results to this file")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    results = asyncio.run(main(args))
+    print_report(results, args)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
@@ -0,0 +1,472 @@
+"""
+Load test for the WebSocket chat.
+
+Seeds N trips with M members each, connects every member to /ws/chat/{trip_id}
+on a running server, sends messages at a fixed total rate and reports connect
+time, end-to-end delivery latency percentiles, dropped frames and server
+CPU/memory. The server must use the same DATABASE_URL and JWT secret.
+
+Example:
+    uvicorn main:app --port 8000 &
+    python loadtest_chat.py --trips 20 --members 25 --rate 200 --duration 30 \\
+        --server-pid $(pgrep -of "uvicorn main:app") --json results.json
+"""
+import sys
+sys.path.insert(0, '.')
+
+import argparse
+import asyncio
+import json
+import os
+import time
+import uuid
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import websockets
+from sqlalchemy import insert
+
+from app.database import SessionLocal, engine, Base
+from app.models.user import User
+from app.models.trip import Trip
+from app.models.trip_member import TripMember
+from app.models.message import Message
+from app.utils.security import get_password_hash, create_access_token
+from app.websocket.frames import Frame, ENCODING_JSON, ENCODING_MSGPACK, decode_client_frame
+
+# Seeded accounts are recognisable by this email prefix, for --cleanup
+EMAIL_PREFIX = "loadtest+"
+EMAIL_DOMAIN = "@howl.test"
+# Marker on message content: "<prefix>|<run>|<seq>|<sent monotonic ns>"
+CONTENT_PREFIX = "lt"
+
+
+def seed(run_id: str, trips: int, members: int) -> List[dict]:
+    """Create trips and members for a run. Returns one entry per trip with member ids."""
+    db = SessionLocal()
+    try:
+        Base.metadata.create_all(bind=engine)
+        # One hash for every account; bcrypt per user would dominate seeding time
+        password_hash = get_password_hash("loadtest")
+        now = datetime.utcnow()
+
+        rooms = []
+        users, trip_rows, member_rows = [], [], []
+        for t in range(trips):
+            trip_id = uuid.uuid4()
+            member_ids = [uuid.uuid4() for _ in range(members)]
+            for m, user_id in enumerate(member_ids):
+                users.append({
+                    "id": user_id,
+                    "email": f"{EMAIL_PREFIX}{run_id}-{t}-{m}{EMAIL_DOMAIN}",
+                    "password_hash": password_hash,
+                    "display_name": f"Load {t}-{m}",
+                    "created_at": now,
+                    "updated_at": now
+                })
+                member_rows.append({
+                    "id": uuid.uuid4(),
+                    "trip_id": trip_id,
+                    "user_id": user_id,
+                    "role": "leader" if m == 0 else "member",
+                    "joined_at": now
+                })
+            trip_rows.append({
+                "id": trip_id,
+                "creator_id": member_ids[0],
+                "title": f"Load test {run_id} #{t}",
+                "location": "Localhost",
+                "max_members": members,
+                "tags": [],
+                "created_at": now,
+                "updated_at": now
+            })
+            rooms.append({"trip_id": str(trip_id), "user_ids": [str(u) for u in member_ids]})
+
+        db.execute(insert(User), users)
+        db.execute(insert(Trip), trip_rows)
+        db.execute(insert(TripMember), member_rows)
+        db.commit()
+        return rooms
+    finally:
+        db.close()
+
+
+def cleanup() -> int:
+    """Delete everything created by earlier runs. Returns the number of users removed."""
+    db = SessionLocal()
+    try:
+        user_ids = [
+            row.id for row in
+            db.query(User.id).filter(User.email.like(f"{EMAIL_PREFIX}%{EMAIL_DOMAIN}")).all()
+        ]
+        if not user_ids:
+            return 0
+        trip_ids = [row.id for row in db.query(Trip.id).filter(Trip.creator_id.in_(user_ids)).all()]
+        # Explicit order, so this also works where FK cascades are not enforced (SQLite)
+        db.query(Message).filter(Message.trip_id.in_(trip_ids)).delete(synchronize_session=False)
+        db.query(TripMember).filter(TripMember.trip_id.in_(trip_ids)).delete(synchronize_session=False)
+        db.query(Trip).filter(Trip.id.in_(trip_ids)).delete(synchronize_session=False)
+        db.query(User).filter(User.id.in_(user_ids)).delete(synchronize_session=False)
+        db.commit()
+        return len(user_ids)
+    finally:
+        db.close()
+
+
+class ProcessSampler:
+    """
+    CPU and RSS of the server processes, read from /proc (Linux only).
+
+    Children of the given pids are included, so passing a gunicorn master
+    (or a uvicorn --reload supervisor) samples its workers too.
+    """
+
+    def __init__(self, pids: List[int]):
+        self.pids = self._with_children(pids)
+        self.ticks = os.sysconf("SC_CLK_TCK")
+        self.peak_rss_kb = 0
+        self.samples: List[dict] = []
+        self._start_cpu = 0.0
+        self._start_time = 0.0
+
+    @staticmethod
+    def _with_children(pids: List[int]) -> List[int]:
+        found, pending = [], list(pids)
+        while pending:
+            pid = pending.pop()
+            found.append(pid)
+            try:
+                with open(f"/proc/{pid}/task/{pid}/children") as f:
+                    pending.extend(int(child) for child in f.read().split())
+            except OSError:
+                pass
+        return found
+
+    def _cpu_seconds(self) -> float:
+        total = 0
+        for pid in self.pids:
+            with open(f"/proc/{pid}/stat") as f:
+                # Fields after the parenthesised command name; utime and stime are 14 and 15
+                fields = f.read().rsplit(")", 1)[1].split()
+            total += int(fields[11]) + int(fields[12])
+        return total / self.ticks
+
+    def _rss_kb(self) -> int:
+        total = 0
+        for pid in self.pids:
+            with open(f"/proc/{pid}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        total += int(line.split()[1])
+        return total
+
+    def start(self):
+        self._start_cpu = self._cpu_seconds()
+        self._start_time = time.monotonic()
+        self.peak_rss_kb = self._rss_kb()
+
+    async def run(self, interval: float = 1.0):
+        last_cpu, last_time = self._start_cpu, self._start_time
+        while True:
+            await asyncio.sleep(interval)
+            cpu, now, rss = self._cpu_seconds(), time.monotonic(), self._rss_kb()
+            self.peak_rss_kb = max(self.peak_rss_kb, rss)
+            self.samples.append({
+                "t": round(now - self._start_time, 1),
+                "cpu_percent": round(100 * (cpu - last_cpu) / (now - last_time), 1),
+                "rss_mb": round(rss / 1024, 1)
+            })
+            last_cpu, last_time = cpu, now
+
+    def summary(self) -> dict:
+        elapsed = time.monotonic() - self._start_time
+        return {
+            "pids": self.pids,
+            "cpu_seconds": round(self._cpu_seconds() - self._start_cpu, 2),
+            "cpu_percent_avg": round(100 * (self._cpu_seconds() - self._start_cpu) / elapsed, 1),
+            "rss_mb_end": round(self._rss_kb() / 1024, 1),
+            "rss_mb_peak": round(self.peak_rss_kb / 1024, 1),
+            "samples": self.samples
+        }
+
+
+class Member:
+    """One simulated chat participant with its own socket and receive loop."""
+
+    def __init__(self, run: "LoadTest", trip_id: str, user_id: str):
+        self.run = run
+        self.trip_id = trip_id
+        self.user_id = user_id
+        self.ws = None
+        self.connected = False
+        self.close_code: Optional[int] = None
+
+    async def connect(self):
+        token = create_access_token(data={"sub": self.user_id})
+        url = f"{self.run.base_url}/ws/chat/{self.trip_id}?token={token}&encoding={self.run.encoding}"
+        started = time.monotonic()
+        try:
+            self.ws = await websockets.connect(url, max_size=None, open_timeout=self.run.timeout)
+            # Joined once the server has sent the room's online_users snapshot
+            while True:
+                frame = self._decode(await asyncio.wait_for(self.ws.recv(), timeout=self.run.timeout))
+                if frame.get("type") == "online_users":
+                    break
+        except Exception as e:
+            self.run.connect_errors.append(f"{type(e).__name__}: {e}")
+            return
+        self.run.connect_times.append(time.monotonic() - started)
+        self.connected = True
+        self.run.rooms[self.trip_id].append(self)
+        self.run.tasks.append(asyncio.create_task(self.receive_loop()))
+
+    def _decode(self, data) -> dict:
+        if isinstance(data, bytes):
+            return decode_client_frame(data)
+        return json.loads(data)
+
+    def _encode(self, message: dict):
+        frame = Frame(message)
+        return frame.binary if self.run.encoding == ENCODING_MSGPACK else frame.text
+
+    async def send(self, message: dict):
+        await self.ws.send(self._encode(message))
+
+    async def receive_loop(self):
+        try:
+            async for data in self.ws:
+                frame = self._decode(data)
+                msg_type = frame.get("type")
+                if msg_type == "message":
+                    self.run.on_message(self, frame.get("content", ""))
+                elif msg_type == "ping":
+                    await self.send({"type": "pong"})
+                elif msg_type == "message_failed":
+                    self.run.failed_writes += 1
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            self.connected = False
+            self.close_code = self.ws.close_code
+
+
+class LoadTest:
+    """Drives one run: connect, send at a fixed rate, drain, report."""
+
+    def __init__(self, args, rooms: List[dict]):
+        self.base_url = args.url.rstrip("/")
+        self.encoding = args.encoding
+        self.timeout = args.timeout
+        self.args = args
+        self.run_id = uuid.uuid4().hex[:8]
+        self.members = [
+            Member(self, room["trip_id"], user_id)
+            for room in rooms for user_id in room["user_ids"]
+        ]
+        # trip_id -> connected members
+        self.rooms: Dict[str, List[Member]] = {room["trip_id"]: [] for room in rooms}
+        self.tasks: List[asyncio.Task] = []
+        self.connect_times: List[float] = []
+        self.connect_errors: List[str] = []
+        self.latencies: List[float] = []
+        # seq -> deliveries expected (room size at send time) and received
+        self.expected: Dict[int, int] = {}
+        self.received: Dict[int, int] = {}
+        self.send_errors = 0
+        self.failed_writes = 0
+        self.duplicates = 0
+
+    def on_message(self, member: Member, content: str):
+        parts = content.split("|")
+        if len(parts) != 4 or parts[0] != CONTENT_PREFIX or parts[1] != self.run_id:
+            return
+        seq, sent_ns = int(parts[2]), int(parts[3])
+        self.latencies.append((time.monotonic_ns() - sent_ns) / 1e6)
+        count = self.received.get(seq, 0) + 1
+        if count > self.expected.get(seq, 0):
+            self.duplicates += 1
+        self.received[seq] = count
+
+    async def connect_all(self):
+        semaphore = asyncio.Semaphore(self.args.connect_concurrency)
+
+        async def connect(member: Member):
+            async with semaphore:
+                await member.connect()
+
+        await asyncio.gather(*(connect(member) for member in self.members))
+
+    async def send_loop(self):
+        """Send rate messages per second in total, round-robin over connected members."""
+        interval = 1 / self.args.rate
+        deadline = time.monotonic() + self.args.duration
+        next_send = time.monotonic()
+        seq = 0
+        while time.monotonic() < deadline:
+            senders = [m for m in self.members if m.connected]
+            if not senders:
+                break
+            member = senders[seq % len(senders)]
+            content = f"{CONTENT_PREFIX}|{self.run_id}|{seq}|{time.monotonic_ns()}"
+            self.expected[seq] = sum(1 for m in self.rooms[member.trip_id] if m.connected)
+            try:
+                await member.send({"type": "message", "content": content})
+            except Exception:
+                self.send_errors += 1
+                del self.expected[seq]
+            seq += 1
+            # Fixed schedule, so a slow send does not lower the offered rate
+            next_send += interval
+            delay = next_send - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+    async def close_all(self):
+        await asyncio.gather(
+            *(m.ws.close() for m in self.members if m.ws is not None),
+            return_exceptions=True
+        )
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+
+    def report(self, elapsed: float) -> dict:
+        expected = sum(self.expected.values())
+        delivered = sum(min(self.received.get(seq, 0), n) for seq, n in self.expected.items())
+        close_codes: Dict[str, int] = {}
+        for member in self.members:
+            if member.close_code not in (None, 1000):
+                close_codes[str(member.close_code)] = close_codes.get(str(member.close_code), 0) + 1
+        return {
+            "run_id": self.run_id,
+            "config": {
+                "trips": self.args.trips,
+                "members": self.args.members,
+                "rate": self.args.rate,
+                "duration": self.args.duration,
+                "encoding": self.encoding
+            },
+            "connections": {
+                "attempted": len(self.members),
+                "connected": len(self.connect_times),
+                "errors": len(self.connect_errors),
+                "connect_ms": percentiles([t * 1000 for t in self.connect_times])
+            },
+            "messages": {
+                "sent": len(self.expected),
+                "send_errors": self.send_errors,
+                "failed_writes": self.failed_writes,
+                "send_rate": round(len(self.expected) / elapsed, 1),
+                "deliveries_expected": expected,
+                "deliveries_received": delivered,
+                "dropped": expected - delivered,
+                "duplicates": self.duplicates,
+                "latency_ms": percentiles(self.latencies)
+            },
+            "abnormal_closes": close_codes
+        }
+
+
+def percentiles(values: List[float]) -> dict:
+    """Nearest-rank percentiles, in the units of the input."""
+    if not values:
+        return {}
+    ordered = sorted(values)
+
+    def rank(p: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))], 2)
+
+    return {
+        "min": round(ordered[0], 2),
+        "p50": rank(50),
+        "p90": rank(90),
+        "p99": rank(99),
+        "p999": rank(99.9),
+        "max": round(ordered[-1], 2)
+    }
+
+
+def print_report(result: dict):
+    conns, msgs = result["connections"], result["messages"]
+    print(f"\nConnections: {conns['connected']}/{conns['attempted']} ({conns['errors']} errors)")
+    print(f"  connect ms: {conns['connect_ms']}")
+    print(f"Messages: {msgs['sent']} sent at {msgs['send_rate']}/s, {msgs['send_errors']} send errors, "
+          f"{msgs['failed_writes']} failed writes")
+    print(f"  deliveries: {msgs['deliveries_received']}/{msgs['deliveries_expected']}, "
+          f"{msgs['dropped']} dropped, {msgs['duplicates']} duplicates")
+    print(f"  latency ms: {msgs['latency_ms']}")
+    if result["abnormal_closes"]:
+        print(f"Abnormal closes: {result['abnormal_closes']}")
+    if "server" in result:
+        server = result["server"]
+        print(f"Server: {server['cpu_seconds']} CPU s ({server['cpu_percent_avg']}% avg), "
+              f"RSS {server['rss_mb_end']} MB (peak {server['rss_mb_peak']} MB)")
+
+
+async def main(args) -> dict:
+    print(f"Seeding {args.trips} trips x {args.members} members...")
+    rooms = seed(uuid.uuid4().hex[:8], args.trips, args.members)
+    test = LoadTest(args, rooms)
+
+    sampler = ProcessSampler(args.server_pid) if args.server_pid else None
+    sampler_task = None
+    if sampler:
+        sampler.start()
+        sampler_task = asyncio.create_task(sampler.run())
+
+    print(f"Connecting {len(test.members)} members to {test.base_url}...")
+    await test.connect_all()
+    print(f"Sending {args.rate} msg/s for {args.duration}s...")
+    started = time.monotonic()
+    await test.send_loop()
+    elapsed = time.monotonic() - started
+    # Let in-flight frames arrive before counting drops
+    await asyncio.sleep(args.drain)
+    await test.close_all()
+
+    result = test.report(elapsed)
+    if sampler:
+        sampler_task.cancel()
+        result["server"] = sampler.summary()
+    if test.connect_errors:
+        result["connections"]["sample_errors"] = test.connect_errors[:5]
+    return result
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="WebSocket chat load test")
+    parser.add_argument("--url", default="ws://localhost:8000", help="Server base URL")
+    parser.add_argument("--trips", type=int, default=10, help="Number of chat rooms")
+    parser.add_argument("--members", type=int, default=10, help="Members per room")
+    parser.add_argument("--rate", type=float, default=50, help="Messages per second, in total")
+    parser.add_argument("--duration", type=float, default=20, help="Seconds of sending")
+    parser.add_argument("--drain", type=float, default=3, help="Seconds to wait for deliveries afterwards")
+    parser.add_argument("--encoding", choices=[ENCODING_JSON, ENCODING_MSGPACK], default=ENCODING_JSON)
+    parser.add_argument("--connect-concurrency", type=int, default=50, help="Handshakes in flight")
+    parser.add_argument("--timeout", type=float, default=10, help="Connect timeout in seconds")
+    parser.add_argument("--server-pid", type=int, nargs="+", help="Server process id(s) to sample")
+    parser.add_argument("--json", help="Also write the results to this file")
+    parser.add_argument("--keep", action="store_true", help="Keep the seeded data")
+    parser.add_argument("--cleanup", action="store_true", help="Only delete data from earlier runs")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.cleanup:
+        print(f"Removed {cleanup()} load test users.")
+        sys.exit(0)
+
+    try:
+        result = asyncio.run(main(args))
+    finally:
+        if not args.keep:
+            cleanup()
+
+    print_report(result)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"\nResults written to {args.json}")
+    sys.exit(0 if result["messages"]["dropped"] == 0 and not result["connections"]["errors"] else 1)
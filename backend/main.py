@@ -2,9 +2,16 @@ from fastapi import FastAPI, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 from app.config import get_settings
-from app.database import engine, Base
+from app.database import engine, Base, SessionLocal, startup_lock
 from app.routers import auth_router, users_router, trips_router, messages_router, groups_router, calendar_router, upload_router
-from app.websocket.chat import websocket_chat_endpoint
+from app.websocket.chat import websocket_chat_endpoint, manager
+from app.storage.limits import UploadSizeLimit
+from app.websocket.persistence import message_writer
+from app.websocket.receipts import read_marker
+from app.utils.token_store import purge_expired_tokens
+from app.utils.room_summary import backfill_room_summaries
+from app.storage.images import shutdown_pool
+from app.utils.responses import DEFAULT_RESPONSE_CLASS
 
 settings = get_settings()
 
@@ -12,13 +19,32 @@ settings = get_settings()
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Lifespan context manager for startup and shutdown events."""
-    # Startup: Create database tables
-    Base.metadata.create_all(bind=engine)
+    # Startup: Create database tables. Schema changes to existing tables ship as
+    # Alembic revisions (alembic upgrade head). One worker at a time, so
+    # concurrent workers never race on backfilled rows
+    with startup_lock():
+        Base.metadata.create_all(bind=engine)
+        # Drop expired refresh token records; summarize trips from before room summaries
+        db = SessionLocal()
+        try:
+            purge_expired_tokens(db)
+            backfill_room_summaries(db)
+        finally:
+            db.close()
+    # Join the cross-worker chat backplane and start batching message and read-pointer writes
+    await manager.start()
+    await message_writer.start()
+    await read_marker.start()
     print("Howl Backend Started!")
     print(f"API Docs: {settings.backend_url}/docs")
     yield
     # Shutdown
     print("Howl Backend Shutting Down...")
+    # Flush chat messages and read pointers that are still pending
+    await message_writer.stop()
+    await read_marker.stop()
+    await manager.stop()
+    shutdown_pool()
 
 
 # Create FastAPI application
@@ -26,9 +52,17 @@ app = FastAPI(
     title="Howl API",
     description="Backend API for Howl - Adventure Trip Planning App",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=DEFAULT_RESPONSE_CLASS
 )
 
+# Refuse oversized uploads before their body is spooled to disk. Added before
+# CORS so CORS wraps it and the browser can read the 413
+app.add_middleware(UploadSizeLimit, limits={
+    "/api/upload": settings.max_upload_bytes,
+    "/api/users/me/avatar": settings.max_avatar_bytes,
+})
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -43,12 +77,13 @@ app.add_middleware(
 )
 
 # Mount static files
-from fastapi.staticfiles import StaticFiles
+from app.storage import UploadStaticFiles
 import os
 
 # Create uploads directory if not exists
 os.makedirs("uploads", exist_ok=True)
-app.mount("/static", StaticFiles(directory="uploads"), name="static")
+# Content-named uploads are cached by clients as immutable
+app.mount("/static", UploadStaticFiles(directory="uploads", max_age=settings.static_max_age), name="static")
 
 # Include routers
 app.include_router(auth_router)
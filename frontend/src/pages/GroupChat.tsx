@@ -24,6 +24,7 @@ export default function GroupChat() {
     const [messages, setMessages] = useState<any[]>([]);
     const [inputText, setInputText] = useState("");
     const [isLoading, setIsLoading] = useState(true);
+    const [isConnected, setIsConnected] = useState(false);
     const [groupInfo, setGroupInfo] = useState({
         title: "Pack Chat",
         member_count: 0,
@@ -38,7 +39,7 @@ export default function GroupChat() {
             if (!id) return;
             try {
                 const [messagesData, groupData] = await Promise.all([
-                    messagesApi.getHistory(id),
+                    messagesApi.getLatest(id),
                     groupsApi.getGroupDetails(id)
                 ]);
                 setMessages(messagesData.messages);
@@ -62,6 +63,15 @@ export default function GroupChat() {
         loadData();
     }, [id]);
 
+    // Move the read pointer to the newest message (debounced server-side)
+    useEffect(() => {
+        const last = messages[messages.length - 1];
+        const ws = wsRef.current;
+        if (isConnected && last && last.id.includes('-') && ws && ws.readyState === WebSocket.OPEN) {
+            ws.send(JSON.stringify({ type: 'read', message_id: last.id }));
+        }
+    }, [messages, isConnected]);
+
     // Setup WebSocket connection
     useEffect(() => {
         if (!id || !user) return;
@@ -72,10 +82,16 @@ export default function GroupChat() {
 
             ws.onopen = () => {
                 console.log('WebSocket Connected!');
+                setIsConnected(true);
             };
 
             ws.onmessage = (event) => {
                 const data = JSON.parse(event.data);
+                if (data.type === 'ping') {
+                    // Server heartbeat; unanswered sockets are dropped as idle
+                    ws.send(JSON.stringify({ type: 'pong' }));
+                    return;
+                }
                 if (data.type === 'message') {
                     setMessages(prev => {
                         const isMe = data.sender_id === user.id;
@@ -124,6 +140,7 @@ export default function GroupChat() {
             };
 
             ws.onclose = (event) => {
+                setIsConnected(false);
                 // Ignore 1000 (Normal) and 1006 (Abnormal) if we instigated the close via cleanup
                 // or if the socket is already closed/closing
                 const isIntentional = ws.readyState === WebSocket.CLOSED || ws.readyState === WebSocket.CLOSING;
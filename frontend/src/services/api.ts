@@ -266,6 +266,18 @@ export const messagesApi = {
     getHistory: (tripId: string, skip = 0, limit = 50) =>
         api.get<MessageList>(`/api/messages/trips/${tripId}?skip=${skip}&limit=${limit}`),
 
+    // The newest page; older pages follow with getOlder
+    getLatest: (tripId: string, limit = 50) =>
+        api.get<MessageList>(`/api/messages/trips/${tripId}?latest=true&limit=${limit}`),
+
+    // Only messages newer than one the client already has
+    getNewer: (tripId: string, afterId: string, limit = 50) =>
+        api.get<MessageList>(`/api/messages/trips/${tripId}?after=${afterId}&limit=${limit}`),
+
+    // The page of messages just older than one the client already has
+    getOlder: (tripId: string, beforeId: string, limit = 50) =>
+        api.get<MessageList>(`/api/messages/trips/${tripId}?before=${beforeId}&limit=${limit}`),
+
     send: (tripId: string, content: string) =>
         api.post<Message>(`/api/messages/trips/${tripId}`, { content }),
 };
@@ -434,7 +446,8 @@ export interface Message {
 
 export interface MessageList {
     messages: Message[];
-    total: number;
+    total: number | null;
+    has_more: boolean;
 }
 
 export interface CalendarEvent {